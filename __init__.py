@@ -1,34 +1,32 @@
 #!/usr/bin/env python3
+from userdata import importreport
+
 import os
 import re
 import sys
-import dcs
 import logging
+import threading
 
-import theater.caucasus
-import theater.persiangulf
-import theater.nevada
-
-import ui.window
-import ui.mainmenu
-import ui.newgamemenu
-import ui.corruptedsavemenu
+import ui.rootwindow
 
-from game.game import Game
-from theater import start_generator
 from userdata import persistency, logging as logging_module
 
 assert len(sys.argv) >= 3, "__init__.py should be started with two mandatory arguments: %UserProfile% location and application version"
 
+# modules loaded in the background while the window is already shown, along with the save restore
+DEFERRED_MODULES = ["dcs", "game.game", "theater.start_generator", "theater.registry", "ui.mainmenu", "ui.newgamemenu", "ui.corruptedsavemenu"]
+STARTUP_POLL_INTERVAL = 50
+
 persistency.setup(sys.argv[1])
-dcs.planes.FlyingType.payload_dirs = [os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources\\payloads")]
 
 VERSION_STRING = sys.argv[2]
 logging_module.setup_version_string(VERSION_STRING)
 logging.info("Using {} as userdata folder".format(persistency.base_path()))
 
 
-def proceed_to_main_menu(game: Game):
+def proceed_to_main_menu(game):
+    import ui.mainmenu
+
     m = ui.mainmenu.MainMenu(w, None, game)
     m.display()
 
@@ -52,47 +50,81 @@ def is_version_compatible(save_version):
     return False
 
 
-w = ui.window.Window()
-try:
-    game = persistency.restore_game()
-    if not game or not is_version_compatible(game.settings.version):
-        new_game_menu = None  # type: NewGameMenu
-
-        def start_new_game(player_name: str, enemy_name: str, terrain: str, sams: bool, midgame: bool, multiplier: float):
-            if terrain == "persiangulf":
-                conflicttheater = theater.persiangulf.PersianGulfTheater()
-            elif terrain == "nevada":
-                conflicttheater = theater.nevada.NevadaTheater()
-            else:
-                conflicttheater = theater.caucasus.CaucasusTheater()
-
-            if midgame:
-                for i in range(0, int(len(conflicttheater.controlpoints) / 2)):
-                    conflicttheater.controlpoints[i].captured = True
-
-            start_generator.generate_inital_units(conflicttheater, enemy_name, sams, multiplier)
-            start_generator.generate_groundobjects(conflicttheater)
-            game = Game(player_name=player_name,
-                        enemy_name=enemy_name,
-                        theater=conflicttheater)
-            game.budget = int(game.budget * multiplier)
-            game.settings.multiplier = multiplier
-            game.settings.sams = sams
-            game.settings.version = VERSION_STRING
-
-            if midgame:
-                game.budget = game.budget * 4 * len(list(conflicttheater.conflicts()))
+def load():
+    try:
+        for module_name in DEFERRED_MODULES:
+            __import__(module_name)
+
+        import dcs
+        dcs.planes.FlyingType.payload_dirs = [os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources\\payloads")]
+
+        startup["game"] = persistency.restore_game()
+    except Exception as e:
+        startup["error"] = e
+    finally:
+        startup["finished"] = True
+
+
+def start_new_game(player_name: str, enemy_name: str, terrain: str, sams: bool, midgame: bool, multiplier: float):
+    from game.game import Game
+    from theater import start_generator
+    from theater.registry import create_theater
+
+    conflicttheater = create_theater(terrain)
+
+    if midgame:
+        for i in range(0, int(len(conflicttheater.controlpoints) / 2)):
+            conflicttheater.controlpoints[i].captured = True
+
+    start_generator.generate_inital_units(conflicttheater, enemy_name, sams, multiplier)
+    start_generator.generate_groundobjects(conflicttheater)
+    game = Game(player_name=player_name,
+                enemy_name=enemy_name,
+                theater=conflicttheater)
+    game.budget = int(game.budget * multiplier)
+    game.settings.multiplier = multiplier
+    game.settings.sams = sams
+    game.settings.version = VERSION_STRING
 
+    if midgame:
+        game.budget = game.budget * 4 * len(list(conflicttheater.conflicts()))
+
+    proceed_to_main_menu(game)
+
+
+def proceed():
+    if not startup["finished"]:
+        w.tk.after(STARTUP_POLL_INTERVAL, proceed)
+        return
+
+    import ui.newgamemenu
+    import ui.corruptedsavemenu
+
+    try:
+        if startup["error"]:
+            raise startup["error"]
+
+        game = startup["game"]
+        if not game or not is_version_compatible(game.settings.version):
+            new_game_menu = ui.newgamemenu.NewGameMenu(w, start_new_game)
+            new_game_menu.display()
+        else:
+            if game.settings.version != VERSION_STRING:
+                game.settings.version = VERSION_STRING
+                game.mark_dirty()
             proceed_to_main_menu(game)
+    except Exception as e:
+        logging.exception(e)
+        ui.corruptedsavemenu.CorruptedSaveMenu(w).display()
 
-        new_game_menu = ui.newgamemenu.NewGameMenu(w, start_new_game)
-        new_game_menu.display()
-    else:
-        game.settings.version = VERSION_STRING
-        proceed_to_main_menu(game)
-except Exception as e:
-    logging.exception(e)
-    ui.corruptedsavemenu.CorruptedSaveMenu(w).display()
+    importreport.report()
 
-w.run()
 
+w = ui.rootwindow.Window()
+w.show_message("Loading...")
+
+startup = {"finished": False, "game": None, "error": None}
+threading.Thread(target=load, daemon=True).start()
+w.tk.after(STARTUP_POLL_INTERVAL, proceed)
+
+w.run()
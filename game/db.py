@@ -441,15 +441,14 @@ StartingPosition = typing.Optional[typing.Union[ShipGroup, StaticGroup, Airport,
 
 
 def unit_task(unit: UnitType) -> Task:
-    for task, units in UNIT_BY_TASK.items():
-        if unit in units:
-            return task
+    if unit in TASK_BY_UNIT:
+        return TASK_BY_UNIT[unit]
 
     assert False
 
 
 def find_unittype(for_task: Task, country_name: str) -> typing.List[UnitType]:
-    return [x for x in UNIT_BY_TASK[for_task] if x in UNIT_BY_COUNTRY[country_name]]
+    return list(UNIT_BY_TASK_AND_COUNTRY.get((for_task, country_name), ()))
 
 
 def unit_type_name(unit_type) -> str:
@@ -463,6 +462,8 @@ def unit_type_from_name(name: str) -> UnitType:
         return plane_map[name]
     elif name in ship_map:
         return ship_map[name]
+    elif name in helicopter_map:
+        return helicopter_map[name]
     else:
         return None
 
@@ -486,8 +487,7 @@ def task_name(task) -> str:
 
 
 def choose_units(for_task: Task, factor: float, count: int, country: str) -> typing.Collection[UnitType]:
-    suitable_unittypes = find_unittype(for_task, country)
-    suitable_unittypes.sort(key=lambda x: PRICES[x])
+    suitable_unittypes = UNIT_BY_TASK_AND_COUNTRY_BY_PRICE.get((for_task, country), ())
 
     idx = int(len(suitable_unittypes) * factor)
     variety = int(count + count * factor / 2)
@@ -588,3 +588,23 @@ def _validate_db():
 
 
 _validate_db()
+
+"""
+Reverse indexes of the configuration above, built once at import time (_validate_db guarantees each unit has single task).
+Lists of UNIT_BY_TASK keep their original order, price-sorted lists keep it for units with the same price.
+"""
+TASK_BY_UNIT = {unit_type: task for task, units in UNIT_BY_TASK.items() for unit_type in units}  # type: typing.Dict[UnitType, Task]
+
+UNIT_SET_BY_TASK = {task: frozenset(units) for task, units in UNIT_BY_TASK.items()}  # type: typing.Dict[Task, typing.FrozenSet[UnitType]]
+UNIT_SET_BY_COUNTRY = {country: frozenset(units) for country, units in UNIT_BY_COUNTRY.items()}  # type: typing.Dict[str, typing.FrozenSet[UnitType]]
+
+UNIT_BY_TASK_AND_COUNTRY = {
+    (task, country): tuple(x for x in task_units if x in country_units)
+    for task, task_units in UNIT_BY_TASK.items()
+    for country, country_units in UNIT_SET_BY_COUNTRY.items()
+}  # type: typing.Dict[typing.Tuple[Task, str], typing.Tuple[UnitType, ...]]
+
+UNIT_BY_TASK_AND_COUNTRY_BY_PRICE = {
+    key: tuple(sorted(units, key=lambda x: PRICES[x]))
+    for key, units in UNIT_BY_TASK_AND_COUNTRY.items()
+}  # type: typing.Dict[typing.Tuple[Task, str], typing.Tuple[UnitType, ...]]
@@ -8,14 +8,18 @@ from dcs.unittype import UnitType
 
 from game import *
 from theater import *
-from gen.environmentgen import EnvironmentSettings
+from dcs.mission import Mission
+from gen.environmentgen import EnvironmentSettings, EnviromentGenerator
 from game.db import assigned_units_from, unitdict_from
 
 from userdata.debriefing import Debriefing
-from userdata import persistency
+from userdata import persistency, profiling
 
 DIFFICULTY_LOG_BASE = 1.1
 
+REGULAR_MISSION_FILE_NAME = "liberation_nextturn.miz"
+QUICK_MISSION_FILE_NAME = "liberation_nextturn_quick.miz"
+
 
 class Event:
     silent = False
@@ -73,22 +77,53 @@ class Event:
     def player_defending(self, flights: db.TaskForceDict):
         assert False
 
+    def generate_environment(self):
+        """
+        Chooses environment settings before any of the missions is generated, so both could be generated at once.
+        """
+        self.environment_settings = EnviromentGenerator(Mission(self.game.theater.terrain), None, self.game).generate()
+
     def generate(self):
         self.operation.is_awacs_enabled = self.is_awacs_enabled
         self.operation.ca_slots = self.ca_slots
+        self.operation.environment_settings = self.environment_settings
 
-        self.operation.prepare(self.game.theater.terrain, is_quick=False)
-        self.operation.generate()
-        self.operation.current_mission.save(persistency.mission_path_for("liberation_nextturn.miz"))
+        self.operation.profile = profiling.start(str(self), self.operation)
+
+        self.operation.report_progress("Placing conflict")
+        with self.operation.profile_stage("prepare"):
+            self.operation.prepare(self.game.theater.terrain, is_quick=False)
+        self.operation.report_progress("Generating flights and ground units")
+        with self.operation.profile_stage("generate"):
+            self.operation.generate()
+        self.operation.report_progress("Saving mission")
+        with self.operation.profile_stage("save"):
+            self.operation.save(persistency.mission_path_for(REGULAR_MISSION_FILE_NAME))
+
+        if self.operation.profile:
+            self.operation.profile.save()
+        self.operation.release_mission()
         self.environment_settings = self.operation.environment_settings
 
     def generate_quick(self):
         self.operation.is_awacs_enabled = self.is_awacs_enabled
         self.operation.environment_settings = self.environment_settings
 
-        self.operation.prepare(self.game.theater.terrain, is_quick=True)
-        self.operation.generate()
-        self.operation.current_mission.save(persistency.mission_path_for("liberation_nextturn_quick.miz"))
+        self.operation.profile = profiling.start("{} (quick)".format(self), self.operation)
+
+        self.operation.report_progress("Placing conflict (quick mission)")
+        with self.operation.profile_stage("prepare"):
+            self.operation.prepare(self.game.theater.terrain, is_quick=True)
+        self.operation.report_progress("Generating flights and ground units (quick mission)")
+        with self.operation.profile_stage("generate"):
+            self.operation.generate()
+        self.operation.report_progress("Saving quick mission")
+        with self.operation.profile_stage("save"):
+            self.operation.save(persistency.mission_path_for(QUICK_MISSION_FILE_NAME))
+
+        if self.operation.profile:
+            self.operation.profile.save()
+        self.operation.release_mission()
 
     def commit(self, debriefing: Debriefing):
         for country, losses in debriefing.destroyed_units.items():
@@ -100,18 +135,11 @@ class Event:
             logging.info("base {} commit losses {}".format(cp.base, losses))
             cp.base.commit_losses(losses)
 
+        cps_by_id = {cp.id: cp for cp in self.game.theater.controlpoints}
         for object_identifier in debriefing.destroyed_objects:
-            for cp in self.game.theater.controlpoints:
-                if not cp.ground_objects:
-                    continue
-
-                for i, ground_object in enumerate(cp.ground_objects):
-                    if ground_object.is_dead:
-                        continue
-
-                    if ground_object.matches_string_identifier(object_identifier):
-                        logging.info("cp {} killing ground object {}".format(cp, ground_object.string_identifier))
-                        cp.ground_objects[i].is_dead = True
+            for ground_object in self.game.theater.find_ground_objects(object_identifier):
+                logging.info("cp {} killing ground object {}".format(cps_by_id.get(ground_object.cp_id), ground_object.string_identifier))
+                self.game.theater.kill_ground_object(ground_object)
 
     def skip(self):
         pass
@@ -136,6 +164,7 @@ class UnitsDeliveryEvent(Event):
     def deliver(self, units: typing.Dict[UnitType, int]):
         for k, v in units.items():
             self.units[k] = self.units.get(k, 0) + v
+        self.game.mark_dirty()
 
     def skip(self):
         self.to_cp.base.commision_units(self.units)
@@ -6,12 +6,14 @@ import math
 from dcs.task import *
 from dcs.vehicles import *
 
-from gen.conflictgen import Conflict
+from gen.conflictgen import Conflict, clear_frontline_cache
 from userdata.debriefing import Debriefing
 from theater import *
 
 from . import db
 from .settings import Settings
+from .quickmission import QuickMissionGeneration, QuickMissionGenerationError, QUICK_MISSION_WAIT_INTERVAL
+from .operation.operation import GenerationCancelled, BaseMission
 from .event import *
 
 COMMISION_UNIT_VARIETY = 4
@@ -91,13 +93,36 @@ class Game:
     events = None  # type: typing.List[Event]
     pending_transfers = None  # type: typing.Dict[]
     ignored_cps = None  # type: typing.Collection[ControlPoint]
+    _base_mission = None  # type: BaseMission
+    _dirty = True
+
+    def __setattr__(self, name, value):
+        # public attributes are campaign state, nested state changes are marked by the methods changing it
+        if not name.startswith("_"):
+            object.__setattr__(self, "_dirty", True)
+        object.__setattr__(self, name, value)
 
     def __init__(self, player_name: str, enemy_name: str, theater: ConflictTheater):
         self.settings = Settings()
         self.events = []
         self.theater = theater
+        clear_frontline_cache()
         self.player = player_name
         self.enemy = enemy_name
+        self._base_mission = None
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Returns True if campaign state could have changed since the game was last saved.
+        """
+        return self._dirty
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def mark_saved(self):
+        self._dirty = False
 
     def _roll(self, prob, mult):
         return random.randint(1, 100) <= prob * mult
@@ -228,6 +253,9 @@ class Game:
     def awacs_expense_commit(self):
         self.budget -= AWACS_BUDGET_COST
 
+    def awacs_expense_refund(self):
+        self.budget += AWACS_BUDGET_COST
+
     def units_delivery_event(self, to_cp: ControlPoint) -> UnitsDeliveryEvent:
         event = UnitsDeliveryEvent(attacker_name=self.player,
                                    defender_name=self.player,
@@ -235,22 +263,67 @@ class Game:
                                    to_cp=to_cp,
                                    game=self)
         self.events.append(event)
+        self.mark_dirty()
         return event
 
     def units_delivery_remove(self, event: Event):
         if event in self.events:
             self.events.remove(event)
+            self.mark_dirty()
+
+    def base_mission(self) -> BaseMission:
+        if self._base_mission is None:
+            self._base_mission = BaseMission(self)
 
-    def initiate_event(self, event: Event):
+        return self._base_mission
+
+    def initiate_event(self, event: Event, progress: typing.Callable[[str], None] = None):
         assert event in self.events
 
-        logging.info("Generating {} (regular)".format(event))
-        event.generate()
-        logging.info("Generating {} (quick)".format(event))
-        event.generate_quick()
+        # built before the game is handed over to the quick mission worker, so both missions share it
+        self.base_mission()
+
+        event.operation.progress = progress
+        quick_generation = None
+        try:
+            if self.settings.parallel_mission_generation:
+                if event.environment_settings is None:
+                    event.generate_environment()
+                try:
+                    logging.info("Generating {} (quick, in background)".format(event))
+                    quick_generation = QuickMissionGeneration(event)
+                except OSError as e:
+                    logging.exception(e)
+
+            logging.info("Generating {} (regular)".format(event))
+            event.generate()
+
+            if quick_generation:
+                event.operation.report_progress("Waiting for quick mission")
+                while not quick_generation.wait(QUICK_MISSION_WAIT_INTERVAL):
+                    event.operation.report_progress("Waiting for quick mission")
+
+                try:
+                    event.operation.quick_manifest = quick_generation.result()
+                    return
+                except QuickMissionGenerationError as e:
+                    logging.exception(e)
+                finally:
+                    quick_generation = None
+
+            logging.info("Generating {} (quick)".format(event))
+            event.generate_quick()
+        except GenerationCancelled:
+            logging.info("Generation of {} cancelled".format(event))
+            if quick_generation:
+                quick_generation.cancel()
+            raise
+        finally:
+            event.operation.progress = None
 
     def finish_event(self, event: Event, debriefing: Debriefing):
         logging.info("Finishing event {}".format(event))
+        self.mark_dirty()
         event.commit(debriefing)
         if event.is_successfull(debriefing):
             self.budget += event.bonus()
@@ -268,6 +341,7 @@ class Game:
 
     def pass_turn(self, no_action=False, ignored_cps: typing.Collection[ControlPoint]=None):
         logging.info("Pass turn")
+        self.mark_dirty()
         for event in self.events:
             event.skip()
 
@@ -284,6 +358,8 @@ class Game:
         if ignored_cps:
             self.ignored_cps = ignored_cps
 
+        self._base_mission = None
+
         self.events = []  # type: typing.List[Event]
         self._generate_events()
         self._generate_globalinterceptions()
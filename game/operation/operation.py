@@ -1,10 +1,53 @@
+import copy
+import os
+
 from dcs.lua.parse import loads
 
 from userdata.debriefing import *
+from userdata import profiling
 
 from gen import *
 
 TANKER_CALLSIGNS = ["Texaco", "Arco", "Shell"]
+DEFAULT_OPTIONS_PATH = "resources/default_options.lua"
+
+_default_options = None  # type: typing.Dict
+_default_options_mtime = None  # type: float
+
+
+class GenerationCancelled(Exception):
+    pass
+
+
+def default_options() -> typing.Dict:
+    """
+    Returns copy of the default mission options. Options file is parsed once and only re-parsed if it was modified.
+    """
+    global _default_options, _default_options_mtime
+
+    mtime = os.path.getmtime(DEFAULT_OPTIONS_PATH)
+    if _default_options is None or mtime != _default_options_mtime:
+        with open(DEFAULT_OPTIONS_PATH, "r") as f:
+            _default_options = loads(f.read())["options"]
+        _default_options_mtime = mtime
+
+    # mission keeps the reference to the dict, so each one gets it's own
+    return copy.deepcopy(_default_options)
+
+
+class BaseMission:
+    """
+    Event independent content of the turn missions. Built once per turn and applied to each of the generated missions.
+    Carriers and extra AA depend on the event flights and conflict position, and are generated by the operation.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.options = default_options()
+        self.frontline_smokes = VisualGenerator(None, None, game).plan_frontline_smokes()
+
+    def apply(self, mission: Mission):
+        mission.options.load_from_dict(copy.deepcopy(self.options))
+        VisualGenerator(mission, None, self.game).generate_frontline_smokes(self.frontline_smokes)
 
 
 class Operation:
@@ -14,6 +57,8 @@ class Operation:
     current_mission = None  # type: dcs.Mission
     regular_mission = None  # type: dcs.Mission
     quick_mission = None  # type: dcs.Mission
+    regular_manifest = None  # type: MissionManifest
+    quick_manifest = None  # type: MissionManifest
     conflict = None  # type: Conflict
     armorgen = None  # type: ArmorConflictGenerator
     airgen = None  # type: AircraftConflictGenerator
@@ -32,6 +77,8 @@ class Operation:
     is_quick = None
     is_awacs_enabled = False
     ca_slots = 0
+    progress = None  # type: typing.Callable[[str], None]
+    profile = None  # type: profiling.GenerationProfile
 
     def __init__(self,
                  game,
@@ -46,6 +93,26 @@ class Operation:
         self.to_cp = to_cp
         self.is_quick = False
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # progress callback belongs to the UI and is not carried over to the other processes, neither is the profile
+        state.pop("progress", None)
+        state.pop("profile", None)
+        return state
+
+    def report_progress(self, stage: str):
+        """
+        Reports generation stage. Callback could raise GenerationCancelled to stop the generation.
+        """
+        if self.progress:
+            self.progress(stage)
+
+    def profile_stage(self, stage: str):
+        """
+        Context manager recording the generation stage into the profile, if profiling is enabled.
+        """
+        return profiling.stage(self.profile, stage)
+
     def units_of(self, country_name: str) -> typing.Collection[UnitType]:
         return []
 
@@ -53,6 +120,10 @@ class Operation:
         return True
 
     def initialize(self, mission: Mission, conflict: Conflict):
+        with self.profile_stage("initialize"):
+            self._initialize(mission, conflict)
+
+    def _initialize(self, mission: Mission, conflict: Conflict):
         self.current_mission = mission
         self.conflict = conflict
         self.armorgen = ArmorConflictGenerator(mission, conflict)
@@ -71,16 +142,14 @@ class Operation:
         self.extra_aagen = ExtraAAConflictGenerator(mission, conflict, self.game, player_name, enemy_name)
 
     def prepare(self, terrain: Terrain, is_quick: bool):
-        with open("resources/default_options.lua", "r") as f:
-            options_dict = loads(f.read())["options"]
-
         self.current_mission = dcs.Mission(terrain)
         if is_quick:
             self.quick_mission = self.current_mission
         else:
             self.regular_mission = self.current_mission
 
-        self.current_mission.options.load_from_dict(options_dict)
+        with self.profile_stage("base_mission"):
+            self.game.base_mission().apply(self.current_mission)
         self.is_quick = is_quick
 
         if is_quick:
@@ -90,6 +159,29 @@ class Operation:
             self.attackers_starting_position = self.from_cp.at
             self.defenders_starting_position = self.to_cp.at
 
+    def save(self, path: str):
+        """
+        Saves the generated mission along with it's manifest, which is all the debriefing needs from the mission.
+        """
+        self.current_mission.save(path)
+
+        manifest = MissionManifest.from_mission(self.current_mission)
+        manifest.save(manifest_path_for(path))
+        if self.is_quick:
+            self.quick_manifest = manifest
+        else:
+            self.regular_manifest = manifest
+
+    def release_mission(self):
+        """
+        Drops the generated mission and generators referencing it once the mission is saved.
+        """
+        self.current_mission = self.regular_mission = self.quick_mission = None
+        self.conflict = None
+        self.armorgen = self.airgen = self.aagen = self.extra_aagen = self.shipgen = None
+        self.triggersgen = self.airsupportgen = self.visualgen = self.envgen = None
+        self.groundobjectgen = self.briefinggen = None
+
     def prepare_carriers(self, for_units: db.UnitsDict):
         for global_cp in self.game.theater.controlpoints:
             if not global_cp.is_global:
@@ -103,10 +195,11 @@ class Operation:
                 self.attackers_starting_position = ship
 
     def generate(self):
-        self.visualgen.generate()
+        self.report_progress("Generating air support and ground objects")
 
         # air support
-        self.airsupportgen.generate(self.is_awacs_enabled)
+        with self.profile_stage("airsupportgen"):
+            self.airsupportgen.generate(self.is_awacs_enabled)
         for i, tanker_type in enumerate(self.airsupportgen.generated_tankers):
             self.briefinggen.append_frequency("Tanker {} ({})".format(TANKER_CALLSIGNS[i], tanker_type), "{}X/{} MHz AM".format(97+i, 130+i))
 
@@ -121,25 +214,30 @@ class Operation:
             self.current_mission.groundControl.red_tactical_commander = self.ca_slots
 
         # ground infrastructure
-        self.groundobjectgen.generate()
-        self.extra_aagen.generate()
+        with self.profile_stage("groundobjectgen"):
+            self.groundobjectgen.generate()
+        with self.profile_stage("extra_aagen"):
+            self.extra_aagen.generate()
 
         # triggers
+        self.report_progress("Generating triggers and briefing")
         if self.game.is_player_attack(self.conflict.attackers_side):
             cp = self.conflict.from_cp
         else:
             cp = self.conflict.to_cp
 
-        self.triggersgen.generate(player_cp=cp,
-                                  is_quick=self.is_quick,
-                                  activation_trigger_radius=self.trigger_radius,
-                                  awacs_enabled=self.is_awacs_enabled)
+        with self.profile_stage("triggersgen"):
+            self.triggersgen.generate(player_cp=cp,
+                                      is_quick=self.is_quick,
+                                      activation_trigger_radius=self.trigger_radius,
+                                      awacs_enabled=self.is_awacs_enabled)
 
         # env settings
-        if self.environment_settings is None:
-            self.environment_settings = self.envgen.generate()
-        else:
-            self.envgen.load(self.environment_settings)
+        with self.profile_stage("envgen"):
+            if self.environment_settings is None:
+                self.environment_settings = self.envgen.generate()
+            else:
+                self.envgen.load(self.environment_settings)
 
         # main frequencies
         self.briefinggen.append_frequency("Flight", "251 MHz AM")
@@ -147,4 +245,5 @@ class Operation:
             self.briefinggen.append_frequency("Carrier", "20X/ICLS CHAN1")
 
         # briefing
-        self.briefinggen.generate()
+        with self.profile_stage("briefinggen"):
+            self.briefinggen.generate()
@@ -41,12 +41,12 @@ class StrikeOperation(Operation):
 
         targets = []  # type: typing.List[typing.Tuple[str, str, Point]]
         category_counters = {}  # type: typing.Dict[str, int]
-        processed_groups = []
+        processed_groups = set()
         for object in self.to_cp.ground_objects:
             if object.group_identifier in processed_groups:
                 continue
 
-            processed_groups.append(object.group_identifier)
+            processed_groups.add(object.group_identifier)
             category_counters[object.category] = category_counters.get(object.category, 0) + 1
             markpoint_name = "{}{}".format(object.name_abbrev, category_counters[object.category])
             targets.append((str(object), markpoint_name, object.position))
@@ -0,0 +1,123 @@
+import logging
+import typing
+import pickle
+import subprocess
+import threading
+import sys
+import os
+
+import dcs
+
+from userdata import persistency
+from userdata.debriefing import MissionManifest, manifest_path_for
+from game.event.event import QUICK_MISSION_FILE_NAME
+
+"""
+Quick mission is generated in a separate python process while regular one is generated in the main process.
+Worker is started as a module rather than through multiprocessing: latter would re-run __init__.py in the child,
+which opens up the main window. One worker is kept on standby so that interpreter startup and imports are already
+done by the time the event is generated. Worker saves the mission itself and only the manifest is read back.
+"""
+
+# interval in seconds in which the caller checks for cancellation while waiting for the worker
+QUICK_MISSION_WAIT_INTERVAL = 0.1
+
+_standby_worker = None  # type: subprocess.Popen
+
+
+class QuickMissionGenerationError(Exception):
+    pass
+
+
+def _spawn_worker() -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", __name__] + sys.argv[1:],
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            cwd=os.getcwd())
+
+
+def prepare_quick_mission_worker():
+    global _standby_worker
+    if _standby_worker is None or _standby_worker.poll() is not None:
+        _standby_worker = _spawn_worker()
+
+
+def _take_worker() -> subprocess.Popen:
+    global _standby_worker
+    prepare_quick_mission_worker()
+    worker, _standby_worker = _standby_worker, None
+    return worker
+
+
+class QuickMissionGeneration:
+    def __init__(self, event):
+        # manifest of the previous quick mission should not be mistaken for the result
+        self._manifest_path = manifest_path_for(persistency.mission_path_for(QUICK_MISSION_FILE_NAME))
+        if os.path.exists(self._manifest_path):
+            os.remove(self._manifest_path)
+
+        # event is pickled right away so that worker gets the state before regular generation modifies it
+        payload = pickle.dumps({
+            "user_folder": persistency._user_folder,
+            "payload_dirs": dcs.planes.FlyingType.payload_dirs,
+            "event": event,
+        })
+
+        self._errors = None  # type: bytes
+        self._process = _take_worker()
+
+        # pipes are drained in the background so the worker doesn't block on them while regular mission is generated
+        self._thread = threading.Thread(target=self._communicate, args=(payload, ), daemon=True)
+        self._thread.start()
+
+    def _communicate(self, payload: bytes):
+        _, self._errors = self._process.communicate(payload)
+
+    def cancel(self):
+        self._process.kill()
+        self._thread.join()
+        prepare_quick_mission_worker()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for the worker to finish. Returns whether it has finished.
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def result(self) -> MissionManifest:
+        self._thread.join()
+
+        for line in (self._errors or b"").decode(errors="replace").splitlines():
+            logging.info("quick mission worker: {}".format(line))
+
+        try:
+            if self._process.returncode != 0:
+                raise QuickMissionGenerationError("Worker exited with code {}".format(self._process.returncode))
+
+            return MissionManifest.load(self._manifest_path)
+        except (OSError, ValueError, KeyError) as e:
+            raise QuickMissionGenerationError("Failed to load generated mission manifest: {}".format(e))
+        finally:
+            prepare_quick_mission_worker()
+
+
+def _run_worker():
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+
+    try:
+        request = pickle.load(sys.stdin.buffer)
+    except EOFError:
+        # application exited while worker was on standby
+        return
+
+    persistency.setup(request["user_folder"])
+    dcs.planes.FlyingType.payload_dirs = request["payload_dirs"]
+
+    event = request["event"]
+    event.generate_quick()
+
+
+if __name__ == "__main__":
+    _run_worker()
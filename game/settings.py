@@ -5,6 +5,7 @@ class Settings:
     enemy_vehicle_skill = "Average"
     only_player_takeoff = True
     night_disabled = False
+    parallel_mission_generation = True
 
     multiplier = 1
     sams = True
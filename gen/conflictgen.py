@@ -29,6 +29,7 @@ CAP_CAS_DISTANCE = 10000, 120000
 GROUND_INTERCEPT_SPREAD = 5000
 GROUND_DISTANCE_FACTOR = 1
 GROUND_DISTANCE = 4000
+GROUND_POSITION_STEP = 500
 
 GROUND_ATTACK_DISTANCE = 25000, 13000
 
@@ -64,6 +65,39 @@ def _heading_sum(h, a) -> int:
         return h
 
 
+FrontlineCacheKey = typing.Tuple[ConflictTheater, ControlPoint, ControlPoint]
+
+"""
+Frontline geometry caches. Frontline only depends on the positions and state of both control points,
+so entries are stored per control point pair together with the state they were computed for
+and are recomputed once base strengths or ownership of either point change.
+"""
+_frontline_position_cache = {}  # type: typing.Dict[FrontlineCacheKey, typing.Tuple[typing.Tuple, typing.Any]]
+_frontline_vector_cache = {}  # type: typing.Dict[FrontlineCacheKey, typing.Tuple[typing.Tuple, typing.Any]]
+
+
+def _frontline_state(from_cp: ControlPoint, to_cp: ControlPoint) -> typing.Tuple:
+    return from_cp.base.strength, to_cp.base.strength, from_cp.captured, to_cp.captured
+
+
+def _cached_frontline(cache: typing.Dict, theater: ConflictTheater, from_cp: ControlPoint, to_cp: ControlPoint, compute: typing.Callable):
+    key = theater, from_cp, to_cp
+    state = _frontline_state(from_cp, to_cp)
+
+    cached = cache.get(key)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+
+    value = compute()
+    cache[key] = state, value
+    return value
+
+
+def clear_frontline_cache():
+    _frontline_position_cache.clear()
+    _frontline_vector_cache.clear()
+
+
 class Conflict:
     attackers_side = None  # type: Country
     defenders_side = None  # type: Country
@@ -156,6 +190,16 @@ class Conflict:
 
     @classmethod
     def frontline_position(cls, theater: ConflictTheater, from_cp: ControlPoint, to_cp: ControlPoint) -> typing.Optional[typing.Tuple[Point, int]]:
+        return _cached_frontline(_frontline_position_cache, theater, from_cp, to_cp,
+                                 lambda: cls._calculate_frontline_position(theater, from_cp, to_cp))
+
+    @classmethod
+    def frontline_vector(cls, from_cp: ControlPoint, to_cp: ControlPoint, theater: ConflictTheater) -> typing.Optional[typing.Tuple[Point, int, int]]:
+        return _cached_frontline(_frontline_vector_cache, theater, from_cp, to_cp,
+                                 lambda: cls._calculate_frontline_vector(from_cp, to_cp, theater))
+
+    @classmethod
+    def _calculate_frontline_position(cls, theater: ConflictTheater, from_cp: ControlPoint, to_cp: ControlPoint) -> typing.Optional[typing.Tuple[Point, int]]:
         attack_heading = from_cp.position.heading_between_point(to_cp.position)
         attack_distance = from_cp.position.distance_to_point(to_cp.position)
         middle_point = from_cp.position.point_from_heading(attack_heading, attack_distance / 2)
@@ -171,7 +215,7 @@ class Conflict:
 
 
     @classmethod
-    def frontline_vector(cls, from_cp: ControlPoint, to_cp: ControlPoint, theater: ConflictTheater) -> typing.Optional[typing.Tuple[Point, int, int]]:
+    def _calculate_frontline_vector(cls, from_cp: ControlPoint, to_cp: ControlPoint, theater: ConflictTheater) -> typing.Optional[typing.Tuple[Point, int, int]]:
         frontline = cls.frontline_position(theater, from_cp, to_cp)
         if not frontline:
             return None
@@ -200,10 +244,11 @@ class Conflict:
 
     @classmethod
     def _extend_ground_position(cls, initial: Point, max_distance: int, heading: int, theater: ConflictTheater) -> Point:
+        positions = (initial.point_from_heading(heading, offset) for offset in range(0, int(max_distance), GROUND_POSITION_STEP))
+
         pos = initial
-        for offset in range(0, int(max_distance), 500):
-            new_pos = initial.point_from_heading(heading, offset)
-            if theater.is_on_land(new_pos):
+        for new_pos, is_on_land in theater.is_on_land_iter(positions):
+            if is_on_land:
                 pos = new_pos
             else:
                 return pos
@@ -212,13 +257,11 @@ class Conflict:
 
     @classmethod
     def _find_ground_position(cls, initial: Point, max_distance: int, heading: int, theater: ConflictTheater) -> typing.Optional[Point]:
-        pos = initial
-        for _ in range(0, int(max_distance), 500):
-            if theater.is_on_land(pos):
+        positions = (initial.point_from_heading(heading, offset) for offset in range(0, int(max_distance), GROUND_POSITION_STEP))
+        for pos, is_on_land in theater.is_on_land_iter(positions):
+            if is_on_land:
                 return pos
 
-            pos = pos.point_from_heading(heading, 500)
-
         logging.info("Didn't find ground position!")
         return None
 
@@ -390,10 +433,9 @@ class Conflict:
 
         initial_distance = min(int(from_cp.position.distance_to_point(to_cp.position) * NAVAL_INTERCEPT_DISTANCE_FACTOR), NAVAL_INTERCEPT_DISTANCE_MAX)
         initial_position = to_cp.position.point_from_heading(radial, initial_distance)
-        for offset in range(0, initial_distance, NAVAL_INTERCEPT_STEP):
-            position = initial_position.point_from_heading(_opposite_heading(radial), offset)
-
-            if not theater.is_on_land(position):
+        positions = (initial_position.point_from_heading(_opposite_heading(radial), offset) for offset in range(0, initial_distance, NAVAL_INTERCEPT_STEP))
+        for position, is_on_land in theater.is_on_land_iter(positions):
+            if not is_on_land:
                 break
 
         attacker_heading = from_cp.position.heading_between_point(to_cp.position)
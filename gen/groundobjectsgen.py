@@ -52,7 +52,7 @@ class GroundObjectsGenerator:
 
         for ground_object in cp.ground_objects:
             if ground_object.dcs_identifier == "AA":
-                if ground_object.position.distance_to_point(self.conflict.from_cp.position) < AA_CP_MIN_DISTANCE:
+                if ground_object.distance_to_point(self.conflict.from_cp.position) < AA_CP_MIN_DISTANCE:
                     continue
 
                 if ground_object.is_dead:
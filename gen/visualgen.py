@@ -96,7 +96,8 @@ class VisualGenerator:
         self.conflict = conflict
         self.game = game
 
-    def _generate_frontline_smokes(self):
+    def plan_frontline_smokes(self) -> typing.List[typing.Tuple[typing.Type[unittype.StaticType], Point]]:
+        smokes = []
         for from_cp, to_cp in self.game.theater.conflicts():
             if from_cp.is_global or to_cp.is_global:
                 continue
@@ -117,13 +118,19 @@ class VisualGenerator:
                         if not self.game.theater.is_on_land(pos):
                             break
 
-                        self.mission.static_group(
-                            self.mission.country(self.game.enemy),
-                            "",
-                            _type=v,
-                            position=pos)
+                        smokes.append((v, pos))
                         break
 
+        return smokes
+
+    def generate_frontline_smokes(self, smokes: typing.List[typing.Tuple[typing.Type[unittype.StaticType], Point]]):
+        for smoke_type, position in smokes:
+            self.mission.static_group(
+                self.mission.country(self.game.enemy),
+                "",
+                _type=smoke_type,
+                position=position)
+
     def generate_target_smokes(self, target):
         spread = target.size * DESTINATION_SMOKE_DISTANCE_FACTOR
         for _ in range(0, int(target.size * DESTINATION_SMOKE_AMOUNT_FACTOR * (1.1 - target.base.strength))):
@@ -156,6 +163,3 @@ class VisualGenerator:
             _type=Outpost,
             position=at
         )
-
-    def generate(self):
-        self._generate_frontline_smokes()
@@ -0,0 +1,221 @@
+"""
+Mission generation benchmark. For each theater and each event type (both player attacking and defending, where
+event supports it) sets up flights, generates regular and quick missions and saves them into the temporary folder.
+Wall time is reported per event and split by the generator it was spent in. Time is exclusive: time of nested
+generator calls is attributed to the inner generator only, "operation" is the time spent in the operation itself.
+
+Should be run from the repository root:
+    python resources/tools/benchmark_missions.py [--repeat 3] [--seed 0]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import typing
+import sys
+import os
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import dcs
+from dcs.task import *
+
+from game import db
+from game.game import Game
+from game.event import *
+from game.operation.operation import Operation, BaseMission
+from gen import *
+from gen.conflictgen import clear_frontline_cache
+from theater import start_generator
+from theater.conflicttheater import LAND
+from theater.caucasus import CaucasusTheater
+from theater.persiangulf import PersianGulfTheater
+from theater.nevada import NevadaTheater
+from userdata import persistency
+
+THEATERS = [CaucasusTheater, PersianGulfTheater, NevadaTheater]
+PLAYER_NAME = "USA"
+ENEMY_NAME = "Russia"
+
+DEFAULT_REPEAT = 3
+FLIGHT_SIZE = 2
+
+PLAYER_ATTACKING_EVENTS = [BaseAttackEvent, FrontlineAttackEvent, FrontlinePatrolEvent, InfantryTransportEvent,
+                           InterceptEvent, NavalInterceptEvent, StrikeEvent]
+PLAYER_DEFENDING_EVENTS = [BaseAttackEvent, InterceptEvent, NavalInterceptEvent, InsurgentAttackEvent]
+FRONTLINE_EVENTS = [FrontlineAttackEvent, FrontlinePatrolEvent, InfantryTransportEvent]
+
+# events which tasks differ when player is defending
+DEFENDING_TASKS = {
+    BaseAttackEvent: [CAP],
+    NavalInterceptEvent: [CAP],
+}
+
+# classes which methods are timed, along with the conflict placement and mission saving
+GENERATORS = [AircraftConflictGenerator, ArmorConflictGenerator, AAConflictGenerator, ExtraAAConflictGenerator,
+              ShipGenerator, AirSupportConflictGenerator, TriggersGenerator, VisualGenerator, EnviromentGenerator,
+              GroundObjectsGenerator, BriefingGenerator, BaseMission]
+
+
+class GeneratorTimings:
+    def __init__(self):
+        self.totals = {}  # type: typing.Dict[str, float]
+        self._stack = []  # type: typing.List[typing.List[float]]
+
+    def reset(self):
+        self.totals = {}
+
+    def timed(self, name: str, fn: typing.Callable) -> typing.Callable:
+        def wrapper(*args, **kwargs):
+            # [start, time spent in nested timed calls]
+            frame = [perf_counter(), 0.0]
+            self._stack.append(frame)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._stack.pop()
+                elapsed = perf_counter() - frame[0]
+                self.totals[name] = self.totals.get(name, 0.0) + elapsed - frame[1]
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+
+        return wrapper
+
+    def instrument_class(self, cls, name: str = None):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("__") and attr != "__init__":
+                continue
+
+            if isinstance(value, classmethod):
+                setattr(cls, attr, classmethod(self.timed(name or cls.__name__, value.__func__)))
+            elif callable(value):
+                setattr(cls, attr, self.timed(name or cls.__name__, value))
+
+
+def find_event_cps(game: Game, event_class, player_attacking: bool) -> typing.Optional[typing.Tuple]:
+    for player_cp, enemy_cp in game.theater.conflicts(True):
+        if enemy_cp.is_global:
+            continue
+
+        if event_class in FRONTLINE_EVENTS and not Conflict.has_frontline_between(player_cp, enemy_cp):
+            continue
+
+        if event_class == NavalInterceptEvent and (player_attacking and enemy_cp or player_cp).radials == LAND:
+            continue
+
+        if event_class == StrikeEvent and not enemy_cp.ground_objects:
+            continue
+
+        if player_cp.is_global and (not player_attacking or event_class not in [InterceptEvent, StrikeEvent, NavalInterceptEvent]):
+            continue
+
+        return player_cp, enemy_cp
+
+    return None
+
+
+def assign_flights(game: Game, event: Event, player_attacking: bool):
+    tasks = player_attacking and event.tasks or DEFENDING_TASKS.get(type(event), event.tasks)
+
+    flights = {}
+    for task in tasks:
+        unit_type = db.find_unittype(task, game.player)[0]
+        flights[task] = {unit_type: (FLIGHT_SIZE, 0)}
+
+    if player_attacking:
+        event.player_attacking(flights)
+    else:
+        event.player_defending(flights)
+
+
+def benchmark_event(game: Game, event_class, player_attacking: bool, timings: GeneratorTimings) -> typing.Optional[float]:
+    cps = find_event_cps(game, event_class, player_attacking)
+    if not cps:
+        return None
+
+    player_cp, enemy_cp = cps
+    if player_attacking:
+        event = event_class(game.player, game.enemy, player_cp, enemy_cp, game)
+    else:
+        event = event_class(game.enemy, game.player, enemy_cp, player_cp, game)
+
+    try:
+        assign_flights(game, event, player_attacking)
+    except AssertionError:
+        return None
+
+    # per turn caches would otherwise hide placement and base mission cost after the first run
+    clear_frontline_cache()
+    game._base_mission = None
+
+    start = perf_counter()
+    event.generate()
+    event.generate_quick()
+    return perf_counter() - start
+
+
+def create_game(theater_class) -> Game:
+    theater = theater_class()
+    start_generator.generate_inital_units(theater, ENEMY_NAME, True, 1)
+    start_generator.generate_groundobjects(theater)
+    game = Game(player_name=PLAYER_NAME, enemy_name=ENEMY_NAME, theater=theater)
+    game.pass_turn()
+    return game
+
+
+def report_event(title: str, times: typing.List[float], totals: typing.Dict[str, float]):
+    total = sum(times)
+    print("{:<48}{:>12.1f} ms (min {:.1f} ms, max {:.1f} ms)".format(title, total / len(times) * 1000, min(times) * 1000, max(times) * 1000))
+    for name, spent in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+        print("    {:<44}{:>12.1f} ms {:>6.1f}%".format(name, spent / len(times) * 1000, spent / total * 100))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mission generation benchmark")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    user_folder = tempfile.mkdtemp(prefix="liberation_benchmark")
+    os.makedirs(os.path.join(user_folder, "DCS", "Missions"))
+    persistency.setup(user_folder)
+    print("missions are saved to {}".format(user_folder))
+
+    timings = GeneratorTimings()
+    for generator_class in GENERATORS:
+        timings.instrument_class(generator_class)
+    timings.instrument_class(Conflict, "Conflict placement")
+    timings.instrument_class(Operation, "operation")
+    for operation_class in Operation.__subclasses__():
+        timings.instrument_class(operation_class, "operation")
+    dcs.Mission.save = timings.timed("Mission.save", dcs.Mission.save)
+
+    for theater_class in THEATERS:
+        random.seed(args.seed)
+        game = create_game(theater_class)
+        print(theater_class.__name__)
+
+        for player_attacking, event_classes in [(True, PLAYER_ATTACKING_EVENTS), (False, PLAYER_DEFENDING_EVENTS)]:
+            for event_class in event_classes:
+                title = "{} ({})".format(event_class.__name__, player_attacking and "attacking" or "defending")
+                timings.reset()
+
+                times = []
+                for _ in range(args.repeat):
+                    elapsed = benchmark_event(game, event_class, player_attacking, timings)
+                    if elapsed is None:
+                        break
+                    times.append(elapsed)
+
+                if times:
+                    report_event(title, times, timings.totals)
+                else:
+                    print("{:<48}{:>15}".format(title, "skipped"))
+        print()
+
+
+main()
@@ -0,0 +1,215 @@
+"""
+Headless turn simulation benchmark. For each theater generates initial units and ground objects, then plays
+a number of turns: buys units, picks an offered event, assigns flights, finishes it with synthetic debriefing and passes the turn.
+Time (and optionally memory) spent in each phase is reported per theater.
+
+Should be run from the repository root:
+    python resources/tools/benchmark_turns.py [--turns 30] [--seed 0] [--memory]
+"""
+
+import argparse
+import contextlib
+import logging
+import random
+import time
+import tracemalloc
+import typing
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dcs.task import CAP, CAS, PinpointStrike
+
+from game import db
+
+from game.game import Game
+from game.event import Event
+from theater import start_generator
+from theater.caucasus import CaucasusTheater
+from theater.persiangulf import PersianGulfTheater
+from theater.nevada import NevadaTheater
+from userdata.debriefing import Debriefing
+
+THEATERS = [CaucasusTheater, PersianGulfTheater, NevadaTheater]
+PLAYER_NAME = "USA"
+ENEMY_NAME = "Russia"
+
+DEFAULT_TURNS = 30
+FLIGHT_SIZE = 2
+PURCHASED_TASKS = [CAP, CAS, PinpointStrike]
+MAX_LOSSES_FACTOR = 0.5
+DESTROYED_OBJECTS_FACTOR = 0.3
+
+# game internals timed separately within pass_turn
+INSTRUMENTED_GAME_METHODS = ["_budget_player", "_commision_units", "_generate_events", "_generate_globalinterceptions"]
+
+
+class PhaseTimings:
+    def __init__(self, measure_memory: bool):
+        self.measure_memory = measure_memory
+        self.times = {}  # type: typing.Dict[str, typing.List[float]]
+        self.memory = {}  # type: typing.Dict[str, int]
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        memory_before = tracemalloc.get_traced_memory()[0] if self.measure_memory else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times.setdefault(phase, []).append(time.perf_counter() - start)
+            if self.measure_memory:
+                self.memory[phase] = self.memory.get(phase, 0) + tracemalloc.get_traced_memory()[0] - memory_before
+
+    def instrument(self, obj, method_name: str):
+        method = getattr(obj, method_name)
+
+        def timed(*args, **kwargs):
+            with self.measure(method_name.strip("_")):
+                return method(*args, **kwargs)
+
+        setattr(obj, method_name, timed)
+
+    def report(self, title: str):
+        print(title)
+        header = "{:<28}{:>8}{:>12}{:>12}{:>12}".format("phase", "calls", "total ms", "mean ms", "max ms")
+        if self.measure_memory:
+            header += "{:>14}".format("alloc KiB")
+        print(header)
+
+        for phase, times in self.times.items():
+            line = "{:<28}{:>8}{:>12.2f}{:>12.3f}{:>12.3f}".format(phase, len(times), sum(times) * 1000, sum(times) / len(times) * 1000, max(times) * 1000)
+            if self.measure_memory:
+                line += "{:>14.1f}".format(self.memory[phase] / 1024)
+            print(line)
+        print()
+
+
+def purchase_units(game: Game):
+    """
+    Spends the budget as player would in the base menu: units are delivered to random player bases on the next turn.
+    """
+    cps = [x for x in game.theater.player_points() if not x.is_global]
+    deliveries = {}
+    while cps:
+        cp = random.choice(cps)
+        unit_type = random.choice(db.find_unittype(random.choice(PURCHASED_TASKS), game.player))
+        price = db.PRICES[unit_type]
+        if game.budget < price:
+            break
+
+        if cp not in deliveries:
+            deliveries[cp] = game.units_delivery_event(cp)
+
+        deliveries[cp].deliver({unit_type: 1})
+        game.budget -= price
+
+
+def assign_flights(game: Game, event: Event) -> bool:
+    is_player_attack = game.is_player_attack(event)
+    base = is_player_attack and event.from_cp.base or event.to_cp.base
+
+    flights = {}
+    for task in event.tasks:
+        units = task == PinpointStrike and base.armor or base.aircraft
+        units = base._find_best_unit(units, task, FLIGHT_SIZE)
+        if not units:
+            # player couldn't start the event either
+            return False
+
+        flights[task] = {unit_type: (count, 0) for unit_type, count in units.items()}
+
+    try:
+        if is_player_attack:
+            event.player_attacking(flights)
+        else:
+            event.player_defending(flights)
+    except AssertionError:
+        return False
+
+    return True
+
+
+def synthetic_debriefing(event: Event) -> Debriefing:
+    debriefing = Debriefing(dead_units=[], trigger_state={})
+    for country, cp in [(event.attacker_name, event.from_cp), (event.defender_name, event.to_cp)]:
+        units = dict(cp.base.all_units)
+        destroyed = {unit_type: random.randint(0, int(count * MAX_LOSSES_FACTOR)) for unit_type, count in units.items()}
+        debriefing.destroyed_units[country] = destroyed
+        debriefing.alive_units[country] = {unit_type: count - destroyed[unit_type] for unit_type, count in units.items()}
+
+    alive_objects = [x for x in event.to_cp.ground_objects if not x.is_dead]
+    for ground_object in random.sample(alive_objects, int(len(alive_objects) * DESTROYED_OBJECTS_FACTOR)):
+        debriefing.destroyed_objects.append(ground_object.string_identifier)
+
+    return debriefing
+
+
+def benchmark_theater(theater_class, turns: int, measure_memory: bool) -> PhaseTimings:
+    timings = PhaseTimings(measure_memory)
+
+    with timings.measure("theater"):
+        theater = theater_class()
+
+    with timings.measure("generate_inital_units"):
+        start_generator.generate_inital_units(theater, ENEMY_NAME, True, 1)
+
+    with timings.measure("generate_groundobjects"):
+        start_generator.generate_groundobjects(theater)
+
+    with timings.measure("game"):
+        game = Game(player_name=PLAYER_NAME, enemy_name=ENEMY_NAME, theater=theater)
+
+    for method_name in INSTRUMENTED_GAME_METHODS:
+        timings.instrument(game, method_name)
+
+    with timings.measure("pass_turn"):
+        game.pass_turn()
+
+    for _ in range(turns):
+        with timings.measure("purchase_units"):
+            purchase_units(game)
+
+        events = [x for x in game.events if not x.informational]
+        random.shuffle(events)
+
+        for event in events:
+            with timings.measure("assign_flights"):
+                assigned = assign_flights(game, event)
+
+            if assigned:
+                with timings.measure("finish_event"):
+                    game.finish_event(event, synthetic_debriefing(event))
+
+                with timings.measure("pass_turn"):
+                    game.pass_turn(ignored_cps=[event.to_cp])
+                break
+        else:
+            with timings.measure("pass_turn"):
+                game.pass_turn(no_action=True)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn simulation benchmark")
+    parser.add_argument("--turns", type=int, default=DEFAULT_TURNS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="measure allocations with tracemalloc (slows everything down)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.memory:
+        tracemalloc.start()
+
+    for theater_class in THEATERS:
+        random.seed(args.seed)
+        timings = benchmark_theater(theater_class, args.turns, args.memory)
+        timings.report("{} ({} turns)".format(theater_class.__name__, args.turns))
+
+    if args.memory:
+        print("peak traced memory: {:.1f} KiB".format(tracemalloc.get_traced_memory()[1] / 1024))
+
+
+main()
@@ -3,6 +3,8 @@ import pickle
 from dcs.mission import Mission
 from dcs.planes import A_10C
 
+from theater.landmap import Landmap, build_landmap_raster, save_landmap_raster, raster_path_for
+
 for terrain in ["cau", "gulf", "nev"]:
     m = Mission()
     m.load_file("./{}_terrain.miz".format(terrain))
@@ -21,6 +23,11 @@ for terrain in ["cau", "gulf", "nev"]:
             else:
                 inclusion_zones.append(zone)
 
-    with open("../{}landmap.p".format(terrain), "wb") as f:
+    landmap_path = "../{}landmap.p".format(terrain)
+    with open(landmap_path, "wb") as f:
         print(len(inclusion_zones), len(exclusion_zones))
         pickle.dump((inclusion_zones, exclusion_zones), f)
+
+    raster = build_landmap_raster(Landmap(inclusion_zones, exclusion_zones))
+    print(raster.width, raster.height)
+    save_landmap_raster(raster, raster_path_for(landmap_path))
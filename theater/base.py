@@ -17,6 +17,32 @@ PLANES_SCRAMBLE_FACTOR = 0.3
 BASE_MAX_STRENGTH = 1
 BASE_MIN_STRENGTH = 0
 
+UNIT_DICTS = ["aircraft", "armor", "aa"]
+
+
+class BaseTotals:
+    planes = 0  # type: int
+    armor = 0  # type: int
+    aa = 0  # type: int
+    by_task = None  # type: typing.Dict[Task, int]
+    planes_by_task = None  # type: typing.Dict[Task, int]
+
+    def __init__(self, base):
+        self.planes = sum(base.aircraft.values())
+        self.armor = sum(base.armor.values())
+        self.aa = sum(base.aa.values())
+
+        self.by_task = {}
+        self.planes_by_task = {}
+        for unit_type, count in base.aircraft.items():
+            task = db.TASK_BY_UNIT.get(unit_type)
+            self.planes_by_task[task] = self.planes_by_task.get(task, 0) + count
+
+        self.by_task.update(self.planes_by_task)
+        for unit_type, count in itertools.chain(base.armor.items(), base.aa.items()):
+            task = db.TASK_BY_UNIT.get(unit_type)
+            self.by_task[task] = self.by_task.get(task, 0) + count
+
 
 class Base:
     aircraft = {}  # type: typing.Dict[PlaneType, int]
@@ -25,6 +51,10 @@ class Base:
     strength = 1  # type: float
     commision_points = {}
 
+    # totals are asked for constantly by the UI and event generation, so they're cached until units change.
+    # unit dicts should be changed either by the methods below or by assigning a new dict
+    _totals = None  # type: BaseTotals
+
     def __init__(self):
         self.aircraft = {}
         self.armor = {}
@@ -32,20 +62,37 @@ class Base:
         self.commision_points = {}
         self.strength = 1
 
+    def __setattr__(self, name, value):
+        if name in UNIT_DICTS:
+            object.__setattr__(self, "_totals", None)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_totals", None)
+        return state
+
+    @property
+    def totals(self) -> BaseTotals:
+        if self._totals is None:
+            self._totals = BaseTotals(self)
+
+        return self._totals
+
     @property
     def total_planes(self) -> int:
-        return sum(self.aircraft.values())
+        return self.totals.planes
 
     @property
     def total_armor(self) -> int:
-        return sum(self.armor.values())
+        return self.totals.armor
 
     @property
     def total_aa(self) -> int:
-        return sum(self.aa.values())
+        return self.totals.aa
 
     def total_units(self, task: Task) -> int:
-        return sum([c for t, c in itertools.chain(self.aircraft.items(), self.armor.items(), self.aa.items()) if t in db.UNIT_BY_TASK[task]])
+        return self.totals.by_task.get(task, 0)
 
     def total_units_of_type(self, unit_type) -> int:
         return sum([c for t, c in itertools.chain(self.aircraft.items(), self.armor.items(), self.aa.items()) if t == unit_type])
@@ -59,7 +106,7 @@ class Base:
             logging.info("{}: no units for {}".format(self, for_type))
             return {}
 
-        sorted_units = [key for key in dict.keys() if key in db.UNIT_BY_TASK[for_type]]
+        sorted_units = [key for key in dict.keys() if key in db.UNIT_SET_BY_TASK[for_type]]
         sorted_units.sort(key=lambda x: db.PRICES[x], reverse=True)
 
         result = {}
@@ -118,6 +165,8 @@ class Base:
             assert target_dict is not None
             target_dict[unit_type] = target_dict.get(unit_type, 0) + unit_count
 
+        self._totals = None
+
     def commit_losses(self, units_lost: typing.Dict[typing.Any, int]):
         for unit_type, count in units_lost.items():
             if unit_type in self.aircraft:
@@ -138,6 +187,8 @@ class Base:
             if target_array[unit_type] == 0:
                 del target_array[unit_type]
 
+        self._totals = None
+
     def affect_strength(self, amount):
         self.strength += amount
         if self.strength > BASE_MAX_STRENGTH:
@@ -147,7 +198,7 @@ class Base:
 
     def scramble_count(self, multiplier: float, task: Task = None) -> int:
         if task:
-            count = sum([v for k, v in self.aircraft.items() if db.unit_task(k) == task])
+            count = self.totals.planes_by_task.get(task, 0)
         else:
             count = self.total_planes
 
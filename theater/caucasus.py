@@ -13,7 +13,7 @@ class CaucasusTheater(ConflictTheater):
     overview_image = "caumap.gif"
     reference_points = {(-317948.32727306, 635639.37385346): (278.5, 319),
                         (-355692.3067714, 617269.96285781): (263, 352), }
-    landmap = load_landmap("resources\\caulandmap.p")
+    landmap_path = "resources\\caulandmap.p"
     daytime_map = {
         "dawn": (6, 9),
         "day": (9, 18),
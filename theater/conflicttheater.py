@@ -1,10 +1,11 @@
 import typing
 import itertools
+import threading
 
 import dcs
 from dcs.mapping import Point
 
-from .landmap import Landmap, poly_contains
+from .landmap import Landmap, load_landmap
 from .controlpoint import ControlPoint
 from .theatergroundobject import TheaterGroundObject
 
@@ -20,6 +21,9 @@ IMPORTANCE_HIGH = 1.4
 
 GLOBAL_CP_CONFLICT_DISTANCE_MIN = 340000
 
+# points of ray marches are tested in chunks of this size, so that marches ending early don't test the rest
+LANDMAP_QUERY_CHUNK_SIZE = 8
+
 """
 ALL_RADIALS = [0, 45, 90, 135, 180, 225, 270, 315, ]
 COAST_NS_E = [45, 90, 135, ]
@@ -48,63 +52,203 @@ COAST_DR_E = [315, 0, 45, 90, 135]
 COAST_DR_W = [135, 180, 225, 315]
 
 
+class ControlPointsIndex:
+    ownership_version = None  # type: int
+    player_points = None  # type: typing.List[ControlPoint]
+    enemy_points = None  # type: typing.List[ControlPoint]
+    conflicts = None  # type: typing.Dict[bool, typing.List[typing.Tuple[ControlPoint, ControlPoint]]]
+
+    def __init__(self, controlpoints: typing.Collection[ControlPoint], global_reachability: typing.Dict[ControlPoint, typing.List[ControlPoint]]):
+        self.ownership_version = ControlPoint.ownership_version
+        self.player_points = [point for point in controlpoints if point.captured]
+        self.enemy_points = [point for point in controlpoints if not point.captured]
+        self.conflicts = {
+            True: self._conflicts_from(self.player_points, True, global_reachability),
+            False: self._conflicts_from(self.enemy_points, False, global_reachability),
+        }
+
+    def _conflicts_from(self, points: typing.Collection[ControlPoint], from_player: bool, global_reachability) -> typing.List[typing.Tuple[ControlPoint, ControlPoint]]:
+        result = []
+        for cp in points:
+            for connected_point in cp.connected_points:
+                if connected_point.captured == from_player:
+                    continue
+
+                result.append((cp, connected_point))
+                for global_cp in global_reachability.get(connected_point, []):
+                    if global_cp.captured == from_player:
+                        result.append((global_cp, connected_point))
+
+        return result
+
+
+class GroundObjectsIndex:
+    ground_objects_version = None  # type: int
+    by_identifier = None  # type: typing.Dict[str, typing.List[TheaterGroundObject]]
+    by_group = None  # type: typing.Dict[str, typing.List[TheaterGroundObject]]
+
+    def __init__(self, controlpoints: typing.Collection[ControlPoint]):
+        # only alive objects are indexed, killed ones are removed with remove()
+        self.ground_objects_version = ControlPoint.ground_objects_version
+        self.by_identifier = {}
+        self.by_group = {}
+        for cp in controlpoints:
+            for ground_object in cp.ground_objects:
+                if not ground_object.is_dead:
+                    self.by_identifier.setdefault(ground_object.string_identifier, []).append(ground_object)
+                    self.by_group.setdefault(ground_object.group_identifier, []).append(ground_object)
+
+    def remove(self, ground_object: TheaterGroundObject):
+        for index, key in [(self.by_identifier, ground_object.string_identifier), (self.by_group, ground_object.group_identifier)]:
+            objects = index.get(key, [])
+            if ground_object in objects:
+                objects.remove(ground_object)
+            if not objects:
+                index.pop(key, None)
+
+
 class ConflictTheater:
     terrain = None  # type: dcs.terrain.Terrain
     controlpoints = None  # type: typing.Collection[ControlPoint]
 
     reference_points = None  # type: typing.Dict
     overview_image = None  # type: str
-    landmap = None  # type: landmap.Landmap
+    landmap_path = None  # type: str
     daytime_map = None  # type: typing.Dict[str, typing.Tuple[int, int]]
 
+    _index = None  # type: ControlPointsIndex
+    _ground_objects_index = None  # type: GroundObjectsIndex
+    _global_reachability = None  # type: typing.Dict[ControlPoint, typing.List[ControlPoint]]
+
+    # amount of points checked against the landmap, used by the generation profiling
+    landmap_queries = 0
+
+    # landmap is loaded on the first query and shared by all instances of the theater
+    _landmap = None  # type: Landmap
+    _landmap_loaded = False
+    _landmap_lock = threading.Lock()
+
     def __init__(self):
         self.controlpoints = []
 
+        # control points are declared on the theater class, so each theater gets it's own copies of them:
+        # otherwise campaign state and connections would leak into every theater created later in the process
+        theater_class = type(self)
+        for name in dir(theater_class):
+            value = getattr(theater_class, name)
+            if isinstance(value, ControlPoint):
+                setattr(self, name, value.copy())
+
+    def __getstate__(self):
+        # indexes are rebuilt on demand, ownership version and query counter are not valid across sessions
+        state = self.__dict__.copy()
+        state.pop("_index", None)
+        state.pop("_global_reachability", None)
+        state.pop("_ground_objects_index", None)
+        state.pop("landmap_queries", None)
+        return state
+
     def add_controlpoint(self, point: ControlPoint, connected_to: typing.Collection[ControlPoint] = []):
         for connected_point in connected_to:
             point.connect(to=connected_point)
 
         self.controlpoints.append(point)
+        self._index = None
+        self._global_reachability = None
+
+    @property
+    def landmap(self) -> typing.Optional[Landmap]:
+        cls = type(self)
+        # checked on the class itself: subclass of the theater with loaded landmap would otherwise inherit it's flag
+        if not cls.__dict__.get("_landmap_loaded"):
+            with ConflictTheater._landmap_lock:
+                if not cls.__dict__.get("_landmap_loaded"):
+                    cls._landmap = cls.landmap_path and load_landmap(cls.landmap_path) or None
+                    cls._landmap_loaded = True
+
+        return cls._landmap
 
     def is_in_sea(self, point: Point) -> bool:
+        self.landmap_queries += 1
         if not self.landmap:
             return False
 
-        for inclusion_zone in self.landmap[0]:
-            if poly_contains(point.x, point.y, inclusion_zone):
-                return False
-
-        return True
+        return self.landmap.is_in_sea(point.x, point.y)
 
     def is_on_land(self, point: Point) -> bool:
+        self.landmap_queries += 1
         if not self.landmap:
             return True
 
-        is_point_included = False
-        for inclusion_zone in self.landmap[0]:
-            if poly_contains(point.x, point.y, inclusion_zone):
-                is_point_included = True
+        return self.landmap.is_on_land(point.x, point.y)
 
-        if not is_point_included:
-            return False
+    def is_in_sea_many(self, points: typing.Collection[Point]) -> typing.List[bool]:
+        self.landmap_queries += len(points)
+        if not self.landmap:
+            return [False for _ in points]
+
+        return self.landmap.is_in_sea_many([(point.x, point.y) for point in points])
 
-        for exclusion_zone in self.landmap[1]:
-            if poly_contains(point.x, point.y, exclusion_zone):
-                return False
+    def is_on_land_many(self, points: typing.Collection[Point]) -> typing.List[bool]:
+        self.landmap_queries += len(points)
+        if not self.landmap:
+            return [True for _ in points]
+
+        return self.landmap.is_on_land_many([(point.x, point.y) for point in points])
+
+    def is_on_land_iter(self, points: typing.Iterable[Point]) -> typing.Iterator[typing.Tuple[Point, bool]]:
+        """
+        Lazily yields points along with the is_on_land result. Points are queried (and consumed) chunk by chunk,
+        so consumer could stop at the first hit without the rest of the points being built or tested.
+        """
+        points = iter(points)
+        while True:
+            chunk = list(itertools.islice(points, LANDMAP_QUERY_CHUNK_SIZE))
+            if not chunk:
+                return
+
+            yield from zip(chunk, self.is_on_land_many(chunk))
+
+    @property
+    def global_reachability(self) -> typing.Dict[ControlPoint, typing.List[ControlPoint]]:
+        # positions and connections are static, so this only changes when control points are added
+        if self._global_reachability is None:
+            global_cps = [x for x in self.controlpoints if x.is_global]
+            self._global_reachability = {}
+            for cp in self.controlpoints:
+                self._global_reachability[cp] = [x for x in global_cps if x.position.distance_to_point(cp.position) < GLOBAL_CP_CONFLICT_DISTANCE_MIN]
+
+        return self._global_reachability
+
+    @property
+    def index(self) -> ControlPointsIndex:
+        if self._index is None or self._index.ownership_version != ControlPoint.ownership_version:
+            self._index = ControlPointsIndex(self.controlpoints, self.global_reachability)
 
-        return True
+        return self._index
 
     def player_points(self) -> typing.Collection[ControlPoint]:
-        return [point for point in self.controlpoints if point.captured]
+        return self.index.player_points
 
     def conflicts(self, from_player=True) -> typing.Collection[typing.Tuple[ControlPoint, ControlPoint]]:
-        for cp in [x for x in self.controlpoints if x.captured == from_player]:
-            for connected_point in [x for x in cp.connected_points if x.captured != from_player]:
-                yield (cp, connected_point)
-
-                for global_cp in [x for x in self.controlpoints if x.is_global and x.captured == from_player]:
-                    if global_cp.position.distance_to_point(connected_point.position) < GLOBAL_CP_CONFLICT_DISTANCE_MIN:
-                        yield (global_cp, connected_point)
+        return self.index.conflicts[from_player]
 
     def enemy_points(self) -> typing.Collection[ControlPoint]:
-        return [point for point in self.controlpoints if not point.captured]
+        return self.index.enemy_points
+
+    @property
+    def ground_objects_index(self) -> GroundObjectsIndex:
+        if self._ground_objects_index is None or self._ground_objects_index.ground_objects_version != ControlPoint.ground_objects_version:
+            self._ground_objects_index = GroundObjectsIndex(self.controlpoints)
+
+        return self._ground_objects_index
+
+    def find_ground_objects(self, string_identifier: str) -> typing.Collection[TheaterGroundObject]:
+        return list(self.ground_objects_index.by_identifier.get(string_identifier, []))
+
+    def find_ground_object_group(self, group_identifier: str) -> typing.Collection[TheaterGroundObject]:
+        return list(self.ground_objects_index.by_group.get(group_identifier, []))
+
+    def kill_ground_object(self, ground_object: TheaterGroundObject):
+        ground_object.is_dead = True
+        self.ground_objects_index.remove(ground_object)
@@ -17,12 +17,17 @@ class ControlPoint:
     at = None  # type: db.StartPosition
 
     connected_points = None  # type: typing.List[ControlPoint]
-    ground_objects = None  # type: typing.List[TheaterGroundObject]
 
-    captured = False
+    _captured = False
+    _ground_objects = None  # type: typing.List[TheaterGroundObject]
     has_frontline = True
     frontline_offset = 0.0
 
+    # incremented on every ownership change of any control point, used to invalidate theater indexes
+    ownership_version = 0
+    # incremented whenever ground objects of any control point are replaced or added
+    ground_objects_version = 0
+
     def __init__(self, id: int, name: str, position: Point, at, radials: typing.Collection[int], size: int, importance: float, has_frontline=True):
         import theater.base
 
@@ -51,9 +56,52 @@ class ControlPoint:
         import theater.conflicttheater
         return cls(0, name, at, at, theater.conflicttheater.LAND, theater.conflicttheater.SIZE_SMALL, 1, has_frontline=False)
 
+    def copy(self):
+        """
+        Returns control point with the same static data (position, airport, radials, size and importance),
+        but fresh campaign state: not captured, empty base, no connections and no ground objects.
+        """
+        point = ControlPoint(self.id, self.full_name, self.position, self.at, self.radials, self.size, self.importance, self.has_frontline)
+        point.frontline_offset = self.frontline_offset
+        return point
+
     def __str__(self):
         return self.name
 
+    def __setstate__(self, state):
+        # saves made before captured became a property
+        if "captured" in state:
+            state["_captured"] = state.pop("captured")
+        # saves made before ground_objects became a property
+        if "ground_objects" in state:
+            state["_ground_objects"] = state.pop("ground_objects")
+
+        self.__dict__.update(state)
+
+    @property
+    def captured(self) -> bool:
+        return self._captured
+
+    @captured.setter
+    def captured(self, value: bool):
+        if value != self._captured:
+            ControlPoint.ownership_version += 1
+
+        self._captured = value
+
+    @property
+    def ground_objects(self) -> typing.List[TheaterGroundObject]:
+        return self._ground_objects
+
+    @ground_objects.setter
+    def ground_objects(self, value: typing.List[TheaterGroundObject]):
+        ControlPoint.ground_objects_version += 1
+        self._ground_objects = value
+
+    def add_ground_object(self, ground_object: TheaterGroundObject):
+        ControlPoint.ground_objects_version += 1
+        self._ground_objects.append(ground_object)
+
     @property
     def is_global(self):
         return not self.connected_points
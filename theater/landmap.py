@@ -1,17 +1,101 @@
+import os
+import math
+import mmap
 import pickle
+import struct
 import typing
+import logging
+import itertools
 
 Zone = typing.Collection[typing.Tuple[float, float]]
-Landmap = typing.Tuple[typing.Collection[Zone], typing.Collection[Zone]]
+Edge = typing.Tuple[float, float, float, float]
 
+# size of the uniform grid cells used to find zones which could contain the point
+LANDMAP_GRID_CELL_SIZE = 20000
+# height of the horizontal bands used to find zone edges which could be crossed by the ray
+LANDMAP_EDGE_BAND_SIZE = 1000
 
-def load_landmap(filename: str) -> Landmap:
+# size of the cells of the precomputed land/sea raster
+LANDMAP_RASTER_CELL_SIZE = 100
+LANDMAP_RASTER_EXTENSION = ".raster"
+LANDMAP_RASTER_MAGIC = b"LMR1"
+LANDMAP_RASTER_HEADER = struct.Struct("<4sdddII")
+
+# raster cell states, two bits per cell
+RASTER_SEA = 0
+RASTER_LAND = 1
+RASTER_LAKE = 2
+RASTER_MIXED = 3
+
+# margin used to treat edges touching the cell boundary as crossing the cell
+RASTER_EDGE_EPSILON = 0.001
+
+
+def raster_path_for(filename: str) -> str:
+    return os.path.splitext(filename)[0] + LANDMAP_RASTER_EXTENSION
+
+
+def load_landmap(filename: str) -> "Landmap":
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            inclusion_zones, exclusion_zones = pickle.load(f)
     except:
         return None
 
+    landmap = Landmap(inclusion_zones, exclusion_zones)
+    landmap.raster = _cached_landmap_raster(landmap, filename)
+    return landmap
+
+
+def _raster_cache_paths(filename: str) -> typing.List[str]:
+    """
+    Raster is cached next to the landmap, and in the user folder for the installs where resources are read-only.
+    """
+    paths = [raster_path_for(filename)]
+
+    # imported here since theater is also used by the tools without the user folder
+    from userdata import persistency
+    user_path = persistency.cache_path_for(os.path.basename(raster_path_for(filename)))
+    if user_path:
+        paths.append(user_path)
+
+    return paths
+
+
+def _cached_landmap_raster(landmap: "Landmap", filename: str) -> "LandmapRaster":
+    """
+    Rasters are not shipped: raster is built from the landmap on first load and cached.
+    Cache is rebuilt when the landmap is newer than it.
+    """
+    raster_paths = _raster_cache_paths(filename)
+    for raster_path in raster_paths:
+        try:
+            if os.path.getmtime(raster_path) >= os.path.getmtime(filename):
+                raster = load_landmap_raster(raster_path)
+                if raster:
+                    return raster
+        except OSError:
+            pass
+
+    logging.info("Building landmap raster for {}".format(filename))
+    raster = build_landmap_raster(landmap)
+    for raster_path in raster_paths:
+        # written under a temporary name, since quick mission worker could be loading the same raster
+        temporary_path = "{}.{}.tmp".format(raster_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(raster_path), exist_ok=True)
+            save_landmap_raster(raster, temporary_path)
+            os.replace(temporary_path, raster_path)
+            break
+        except OSError as e:
+            # raster is still used for the session, and saved to the next location if there is one
+            log = raster_path == raster_paths[-1] and logging.warning or logging.info
+            log("Failed to save landmap raster {}: {}".format(raster_path, e))
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    return raster
+
 
 def poly_contains(x, y, poly):
     n = len(poly)
@@ -37,3 +121,283 @@ def poly_centroid(poly) -> typing.Tuple[float, float]:
     y = sum(y_list) / len(poly)
     return (x, y)
 
+
+def poly_bounds(poly) -> typing.Tuple[float, float, float, float]:
+    x_list = [vertex[0] for vertex in poly]
+    y_list = [vertex[1] for vertex in poly]
+    return min(x_list), min(y_list), max(x_list), max(y_list)
+
+
+def _edge_crosses(x, y, edge: Edge) -> bool:
+    # same crossing rule as in poly_contains, evaluated for a single edge
+    p1x, p1y, p2x, p2y = edge
+    if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x):
+        if p1x == p2x:
+            return True
+
+        xints = (y-p1y)*(p2x-p1x)/(p2y-p1y)+p1x
+        return x <= xints
+
+    return False
+
+
+class IndexedZone:
+    zone = None  # type: Zone
+    bounds = None  # type: typing.Tuple[float, float, float, float]
+    bands = None  # type: typing.Dict[int, typing.List[Edge]]
+
+    def __init__(self, zone: Zone):
+        self.zone = zone
+        self.bounds = poly_bounds(zone)
+        self.bands = {}
+
+        n = len(zone)
+        for i in range(n):
+            p1x, p1y = zone[i]
+            p2x, p2y = zone[(i + 1) % n]
+            if p1y == p2y:
+                # horizontal edges are never crossed
+                continue
+
+            edge = (p1x, p1y, p2x, p2y)
+            for band in range(_band(min(p1y, p2y)), _band(max(p1y, p2y)) + 1):
+                self.bands.setdefault(band, []).append(edge)
+
+    def contains(self, x, y) -> bool:
+        min_x, min_y, max_x, max_y = self.bounds
+        if not (min_x <= x <= max_x and min_y < y <= max_y):
+            return False
+
+        inside = False
+        for edge in self.bands.get(_band(y), []):
+            if _edge_crosses(x, y, edge):
+                inside = not inside
+
+        return inside
+
+
+class ZoneIndex:
+    zones = None  # type: typing.List[IndexedZone]
+    grid = None  # type: typing.Dict[typing.Tuple[int, int], typing.List[IndexedZone]]
+
+    def __init__(self, zones: typing.Collection[Zone]):
+        self.zones = [IndexedZone(zone) for zone in zones if zone]
+        self.grid = {}
+
+        for indexed_zone in self.zones:
+            min_x, min_y, max_x, max_y = indexed_zone.bounds
+            for cell_x in range(_cell(min_x), _cell(max_x) + 1):
+                for cell_y in range(_cell(min_y), _cell(max_y) + 1):
+                    self.grid.setdefault((cell_x, cell_y), []).append(indexed_zone)
+
+    def contains(self, x, y) -> bool:
+        for indexed_zone in self.grid.get((_cell(x), _cell(y)), []):
+            if indexed_zone.contains(x, y):
+                return True
+
+        return False
+
+    def contains_many(self, coordinates: typing.Iterable[typing.Tuple[float, float]]) -> typing.List[bool]:
+        result = []
+        grid = self.grid
+        for x, y in coordinates:
+            inside = False
+            for indexed_zone in grid.get((_cell(x), _cell(y)), []):
+                if indexed_zone.contains(x, y):
+                    inside = True
+                    break
+
+            result.append(inside)
+
+        return result
+
+
+class LandmapRaster:
+    origin_x = 0.0
+    origin_y = 0.0
+    cell_size = LANDMAP_RASTER_CELL_SIZE
+    width = 0
+    height = 0
+
+    def __init__(self, origin_x: float, origin_y: float, cell_size: float, width: int, height: int, cells):
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.cell_size = cell_size
+        self.width = width
+        self.height = height
+        self.cells = cells
+
+    def state(self, x, y) -> int:
+        column = int(math.floor((x - self.origin_x) / self.cell_size))
+        row = int(math.floor((y - self.origin_y) / self.cell_size))
+        if column < 0 or row < 0 or column >= self.width or row >= self.height:
+            # raster covers every zone, so anything outside of it is sea
+            return RASTER_SEA
+
+        index = row * self.width + column
+        return (self.cells[index >> 2] >> ((index & 3) * 2)) & 3
+
+
+class Landmap:
+    inclusion_zones = None  # type: typing.Collection[Zone]
+    exclusion_zones = None  # type: typing.Collection[Zone]
+    raster = None  # type: LandmapRaster
+
+    def __init__(self, inclusion_zones: typing.Collection[Zone], exclusion_zones: typing.Collection[Zone]):
+        self.inclusion_zones = inclusion_zones
+        self.exclusion_zones = exclusion_zones
+        self.inclusion_index = ZoneIndex(inclusion_zones)
+        self.exclusion_index = ZoneIndex(exclusion_zones)
+
+    def _raster_state(self, x, y) -> int:
+        if self.raster is None:
+            return RASTER_MIXED
+
+        return self.raster.state(x, y)
+
+    def _exact_is_in_sea(self, x, y) -> bool:
+        return not self.inclusion_index.contains(x, y)
+
+    def _exact_is_on_land(self, x, y) -> bool:
+        if not self.inclusion_index.contains(x, y):
+            return False
+
+        return not self.exclusion_index.contains(x, y)
+
+    def is_in_sea(self, x, y) -> bool:
+        state = self._raster_state(x, y)
+        if state == RASTER_MIXED:
+            return self._exact_is_in_sea(x, y)
+
+        return state == RASTER_SEA
+
+    def is_on_land(self, x, y) -> bool:
+        state = self._raster_state(x, y)
+        if state == RASTER_MIXED:
+            return self._exact_is_on_land(x, y)
+
+        return state == RASTER_LAND
+
+    def is_in_sea_many(self, coordinates: typing.Collection[typing.Tuple[float, float]]) -> typing.List[bool]:
+        states = [self._raster_state(x, y) for x, y in coordinates]
+        mixed = [coordinate for coordinate, state in zip(coordinates, states) if state == RASTER_MIXED]
+        mixed_included = iter(self.inclusion_index.contains_many(mixed))
+        return [not next(mixed_included) if state == RASTER_MIXED else state == RASTER_SEA for state in states]
+
+    def is_on_land_many(self, coordinates: typing.Collection[typing.Tuple[float, float]]) -> typing.List[bool]:
+        states = [self._raster_state(x, y) for x, y in coordinates]
+        mixed = [coordinate for coordinate, state in zip(coordinates, states) if state == RASTER_MIXED]
+
+        included = self.inclusion_index.contains_many(mixed)
+        candidates = [coordinate for coordinate, is_included in zip(mixed, included) if is_included]
+        excluded = iter(self.exclusion_index.contains_many(candidates))
+        mixed_on_land = iter([is_included and not next(excluded) for is_included in included])
+        return [next(mixed_on_land) if state == RASTER_MIXED else state == RASTER_LAND for state in states]
+
+
+def load_landmap_raster(filename: str) -> typing.Optional[LandmapRaster]:
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with open(filename, "rb") as f:
+            cells = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception as e:
+        logging.warning("Failed to map landmap raster {}: {}".format(filename, e))
+        return None
+
+    magic, origin_x, origin_y, cell_size, width, height = LANDMAP_RASTER_HEADER.unpack_from(cells, 0)
+    if magic != LANDMAP_RASTER_MAGIC or len(cells) < LANDMAP_RASTER_HEADER.size + (width * height + 3) // 4:
+        logging.warning("Landmap raster {} is invalid, ignoring".format(filename))
+        return None
+
+    return LandmapRaster(origin_x, origin_y, cell_size, width, height, memoryview(cells)[LANDMAP_RASTER_HEADER.size:])
+
+
+def _fill_raster_run(cells: bytearray, start: int, end: int, state: int):
+    if state == RASTER_SEA:
+        return
+
+    while start < end and start & 3:
+        cells[start >> 2] |= state << ((start & 3) * 2)
+        start += 1
+
+    while start < end and end & 3:
+        end -= 1
+        cells[end >> 2] |= state << ((end & 3) * 2)
+
+    if start < end:
+        cells[start >> 2:end >> 2] = bytes([state * 0b01010101]) * ((end - start) >> 2)
+
+
+def build_landmap_raster(landmap: Landmap, cell_size: float = LANDMAP_RASTER_CELL_SIZE) -> LandmapRaster:
+    bounds = [zone.bounds for zone in landmap.inclusion_index.zones + landmap.exclusion_index.zones]
+    origin_x = math.floor(min(x[0] for x in bounds) / cell_size) * cell_size - cell_size
+    origin_y = math.floor(min(x[1] for x in bounds) / cell_size) * cell_size - cell_size
+    width = int(math.ceil((max(x[2] for x in bounds) - origin_x) / cell_size)) + 1
+    height = int(math.ceil((max(x[3] for x in bounds) - origin_y) / cell_size)) + 1
+
+    # mark every cell which is touched by any of the zone edges as mixed
+    mixed_by_row = {}  # type: typing.Dict[int, typing.List[typing.Tuple[int, int]]]
+    for zone in itertools.chain(landmap.inclusion_index.zones, landmap.exclusion_index.zones):
+        n = len(zone.zone)
+        for i in range(n):
+            p1x, p1y = zone.zone[i]
+            p2x, p2y = zone.zone[(i + 1) % n]
+            if p1y > p2y:
+                p1x, p1y, p2x, p2y = p2x, p2y, p1x, p1y
+
+            first_row = int(math.floor((p1y - RASTER_EDGE_EPSILON - origin_y) / cell_size))
+            last_row = int(math.floor((p2y + RASTER_EDGE_EPSILON - origin_y) / cell_size))
+            for row in range(first_row, last_row + 1):
+                if p1y == p2y:
+                    x1, x2 = p1x, p2x
+                else:
+                    y1 = max(p1y, origin_y + row * cell_size)
+                    y2 = min(p2y, origin_y + (row + 1) * cell_size)
+                    x1 = p1x + (y1 - p1y) * (p2x - p1x) / (p2y - p1y)
+                    x2 = p1x + (y2 - p1y) * (p2x - p1x) / (p2y - p1y)
+
+                first_column = int(math.floor((min(x1, x2) - RASTER_EDGE_EPSILON - origin_x) / cell_size))
+                last_column = int(math.floor((max(x1, x2) + RASTER_EDGE_EPSILON - origin_x) / cell_size))
+                mixed_by_row.setdefault(row, []).append((first_column, last_column + 1))
+
+    cells = bytearray((width * height + 3) // 4)
+    for row in range(height):
+        runs = sorted(mixed_by_row.get(row, []))
+        row_start = row * width
+
+        # cells between mixed ones are not crossed by any edge, so the whole run shares the state of any of its points
+        column = 0
+        for mixed_start, mixed_end in runs + [(width, width)]:
+            if mixed_start > column:
+                x = origin_x + (column + 0.5) * cell_size
+                y = origin_y + (row + 0.5) * cell_size
+                if landmap._exact_is_on_land(x, y):
+                    state = RASTER_LAND
+                elif landmap._exact_is_in_sea(x, y):
+                    state = RASTER_SEA
+                else:
+                    state = RASTER_LAKE
+
+                _fill_raster_run(cells, row_start + column, row_start + mixed_start, state)
+
+            if mixed_end > column:
+                _fill_raster_run(cells, row_start + max(column, mixed_start), row_start + mixed_end, RASTER_MIXED)
+                column = mixed_end
+
+    return LandmapRaster(origin_x, origin_y, cell_size, width, height, cells)
+
+
+def save_landmap_raster(raster: LandmapRaster, filename: str):
+    with open(filename, "wb") as f:
+        f.write(LANDMAP_RASTER_HEADER.pack(LANDMAP_RASTER_MAGIC, raster.origin_x, raster.origin_y, raster.cell_size, raster.width, raster.height))
+        f.write(raster.cells)
+
+
+def _cell(coordinate: float) -> int:
+    return int(math.floor(coordinate / LANDMAP_GRID_CELL_SIZE))
+
+
+def _band(coordinate: float) -> int:
+    return int(math.floor(coordinate / LANDMAP_EDGE_BAND_SIZE))
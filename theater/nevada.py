@@ -11,7 +11,7 @@ class NevadaTheater(ConflictTheater):
     overview_image = "nevada.gif"
     reference_points = {(nevada.Mina_Airport_3Q0.position.x, nevada.Mina_Airport_3Q0.position.y): (45, -360),
                         (nevada.Laughlin_Airport.position.x, nevada.Laughlin_Airport.position.y): (440, 80), }
-    landmap = load_landmap("resources\\nev_landmap.p")
+    landmap_path = "resources\\nev_landmap.p"
     daytime_map = {
         "dawn": (4, 6),
         "day": (6, 17),
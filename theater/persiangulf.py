@@ -3,7 +3,6 @@ from dcs import mapping
 
 from .conflicttheater import *
 from .base import *
-from .landmap import load_landmap
 
 
 class PersianGulfTheater(ConflictTheater):
@@ -11,7 +10,7 @@ class PersianGulfTheater(ConflictTheater):
     overview_image = "persiangulf.gif"
     reference_points = {(persiangulf.Sir_Abu_Nuayr.position.x, persiangulf.Sir_Abu_Nuayr.position.y): (321, 145),
                         (persiangulf.Sirri_Island.position.x, persiangulf.Sirri_Island.position.y): (347, 82), }
-    landmap = load_landmap("resources\\gulflandmap.p")
+    landmap_path = "resources\\gulflandmap.p"
     daytime_map = {
         "dawn": (6, 8),
         "day": (8, 16),
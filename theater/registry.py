@@ -0,0 +1,37 @@
+import importlib
+import typing
+
+from .conflicttheater import ConflictTheater
+
+"""
+Theaters available for the new campaigns, by the terrain name. Theater modules set up terrain and control points
+at import time, so only the theater campaign is started on gets imported. Saved campaigns import their theater
+on restore.
+"""
+THEATERS = {
+    "caucasus": "theater.caucasus.CaucasusTheater",
+    "persiangulf": "theater.persiangulf.PersianGulfTheater",
+    "nevada": "theater.nevada.NevadaTheater",
+}  # type: typing.Dict[str, str]
+
+DEFAULT_THEATER = "caucasus"
+
+
+class UnknownTheaterError(Exception):
+    pass
+
+
+def theater_class(terrain: typing.Optional[str] = None) -> typing.Type[ConflictTheater]:
+    # default is only used when no terrain is given: unknown one is most likely a typo or comes from a newer version
+    if not terrain:
+        terrain = DEFAULT_THEATER
+
+    if terrain not in THEATERS:
+        raise UnknownTheaterError("Unknown terrain {!r}, expected one of: {}".format(terrain, ", ".join(THEATERS)))
+
+    module_name, class_name = THEATERS[terrain].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_theater(terrain: typing.Optional[str] = None) -> ConflictTheater:
+    return theater_class(terrain)()
@@ -57,14 +57,12 @@ def generate_groundobjects(theater: ConflictTheater):
                 point = p
 
             if point:
-                for angle in range(0, 360, 45):
-                    p = point.point_from_heading(angle, 2500)
-                    if on_ground and not theater.is_on_land(p):
-                        point = None
-                        break
-                    elif not on_ground and not theater.is_in_sea(p):
-                        point = None
-                        break
+                # stops at the first point of the ring which doesn't match
+                ring = (point.point_from_heading(angle, 2500) for angle in range(0, 360, 45))
+                if on_ground and not all(theater.is_on_land(x) for x in ring):
+                    point = None
+                elif not on_ground and not all(theater.is_in_sea(x) for x in ring):
+                    point = None
 
             if point:
                 return point
@@ -108,4 +106,4 @@ def generate_groundobjects(theater: ConflictTheater):
                 g.heading = object["heading"]
                 g.position = Point(point.x + object["offset"].x, point.y + object["offset"].y)
 
-                cp.ground_objects.append(g)
+                cp.add_ground_object(g)
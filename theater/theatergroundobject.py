@@ -1,4 +1,5 @@
 import typing
+import math
 
 from dcs.mapping import Point
 from dcs.statics import *
@@ -43,32 +44,117 @@ CATEGORY_MAP = {
     "oil": ["Oil platform"],
 }
 
+CATEGORY_BY_IDENTIFIER = {identifier: category for category, identifiers in CATEGORY_MAP.items() for identifier in identifiers}
+
 
 class TheaterGroundObject:
-    cp_id = 0
-    group_id = 0
-    object_id = 0
+    # theaters hold thousands of these, so they're kept compact: no instance dict, position is stored as plain
+    # coordinates, category and identifiers are resolved once and reset only when identity fields change
+    __slots__ = ["_cp_id", "_group_id", "_object_id", "_dcs_identifier", "_category", "_string_identifier",
+                 "_group_identifier", "is_dead", "heading", "_x", "_y"]
+
+    def __init__(self):
+        self._cp_id = 0
+        self._group_id = 0
+        self._object_id = 0
+        self._dcs_identifier = None  # type: str
+        self._category = None  # type: str
+        self._string_identifier = None  # type: str
+        self._group_identifier = None  # type: str
+
+        self.is_dead = False
+        self.heading = 0
+        self._x = None  # type: float
+        self._y = None  # type: float
+
+    def __getstate__(self):
+        return {
+            "cp_id": self._cp_id,
+            "group_id": self._group_id,
+            "object_id": self._object_id,
+            "dcs_identifier": self._dcs_identifier,
+            "is_dead": self.is_dead,
+            "heading": self.heading,
+            "position": self.position,
+        }
+
+    def __setstate__(self, state):
+        # also handles saves made before slots, where state is the instance dict and might miss
+        # attributes which were left at their class level defaults
+        self.__init__()
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def _reset_identifiers(self):
+        self._string_identifier = None
+        self._group_identifier = None
 
-    dcs_identifier = None  # type: str
-    is_dead = False
+    @property
+    def cp_id(self) -> int:
+        return self._cp_id
+
+    @cp_id.setter
+    def cp_id(self, value: int):
+        self._cp_id = value
+        self._reset_identifiers()
+
+    @property
+    def group_id(self) -> int:
+        return self._group_id
 
-    heading = 0
-    position = None  # type: Point
+    @group_id.setter
+    def group_id(self, value: int):
+        self._group_id = value
+        self._reset_identifiers()
+
+    @property
+    def object_id(self) -> int:
+        return self._object_id
+
+    @object_id.setter
+    def object_id(self, value: int):
+        self._object_id = value
+        self._reset_identifiers()
+
+    @property
+    def dcs_identifier(self) -> str:
+        return self._dcs_identifier
+
+    @dcs_identifier.setter
+    def dcs_identifier(self, value: str):
+        self._dcs_identifier = value
+        self._category = CATEGORY_BY_IDENTIFIER.get(value)
+        self._reset_identifiers()
+
+    @property
+    def position(self) -> typing.Optional[Point]:
+        if self._x is None:
+            return None
+
+        return Point(self._x, self._y)
+
+    @position.setter
+    def position(self, value: typing.Optional[Point]):
+        self._x, self._y = (value.x, value.y) if value is not None else (None, None)
 
     @property
     def category(self) -> str:
-        for k, v in CATEGORY_MAP.items():
-            if self.dcs_identifier in v:
-                return k
-        assert False, "Identifier not found in mapping: {}".format(self.dcs_identifier)
+        assert self._category, "Identifier not found in mapping: {}".format(self._dcs_identifier)
+        return self._category
 
     @property
     def string_identifier(self):
-        return "{}|{}|{}|{}".format(self.category, self.cp_id, self.group_id, self.object_id)
+        if self._string_identifier is None:
+            self._string_identifier = "{}|{}|{}|{}".format(self.category, self._cp_id, self._group_id, self._object_id)
+
+        return self._string_identifier
 
     @property
     def group_identifier(self) -> str:
-        return "{}|{}".format(self.category, self.group_id)
+        if self._group_identifier is None:
+            self._group_identifier = "{}|{}".format(self.category, self._group_id)
+
+        return self._group_identifier
 
     @property
     def name_abbrev(self) -> str:
@@ -79,3 +165,6 @@ class TheaterGroundObject:
 
     def matches_string_identifier(self, id):
         return self.string_identifier == id
+
+    def distance_to_point(self, point: Point) -> float:
+        return math.hypot(self._x - point.x, self._y - point.y)
@@ -7,13 +7,15 @@ from .styles import STYLES
 class BaseMenu(Menu):
     bought_amount_labels = None  # type: typing.Collection[Label]
     budget_label = None  # type: Label
+    event = None  # type: UnitsDeliveryEvent
 
     def __init__(self, window: Window, parent, game: Game, cp: ControlPoint):
         super(BaseMenu, self).__init__(window, parent, game)
         self.cp = cp
         self.base = cp.base
         self.frame = window.right_pane
-        self.event = self.game.units_delivery_event(cp)
+        # delivery event is created on the first purchase, so that opening the base menu doesn't change the game
+        self.event = None
         self.bought_amount_labels = {}
 
     def display(self):
@@ -49,7 +51,7 @@ class BaseMenu(Menu):
                 nonlocal column
 
                 existing_units = self.base.total_units_of_type(unit_type)
-                scheduled_units = self.event.units.get(unit_type, 0)
+                scheduled_units = self.event and self.event.units.get(unit_type, 0) or 0
 
                 Label(self.frame, text="{}".format(db.unit_type_name(unit_type)), **STYLES["widget"]).grid(row=row, column=column, sticky=W)
 
@@ -74,7 +76,7 @@ class BaseMenu(Menu):
             column += 5
 
     def dismiss(self):
-        if sum([x for x in self.event.units.values()]) == 0:
+        if self.event and sum([x for x in self.event.units.values()]) == 0:
             self.game.units_delivery_remove(self.event)
 
         super(BaseMenu, self).dismiss()
@@ -82,7 +84,7 @@ class BaseMenu(Menu):
     def _update_count_label(self, unit_type: UnitType):
         self.bought_amount_labels[unit_type]["text"] = "({}{})".format(
             self.cp.base.total_units_of_type(unit_type),
-            unit_type in self.event.units and ", bought {}".format(self.event.units[unit_type]) or ""
+            self.event and unit_type in self.event.units and ", bought {}".format(self.event.units[unit_type]) or ""
         )
 
         self.budget_label["text"] = "Budget: {}m".format(self.game.budget)
@@ -91,6 +93,9 @@ class BaseMenu(Menu):
         def action():
             price = db.PRICES[unit_type]
             if self.game.budget >= price:
+                if self.event is None:
+                    self.event = self.game.units_delivery_event(self.cp)
+
                 self.event.deliver({unit_type: 1})
                 self.game.budget -= price
 
@@ -100,7 +105,7 @@ class BaseMenu(Menu):
 
     def sell(self, unit_type):
         def action():
-            if self.event.units.get(unit_type, 0) > 0:
+            if self.event and self.event.units.get(unit_type, 0) > 0:
                 price = db.PRICES[unit_type]
                 self.game.budget += price
                 self.event.units[unit_type] = self.event.units[unit_type] - 1
@@ -30,6 +30,9 @@ class ConfigurationMenu(Menu):
         self.cold_start_var = BooleanVar()
         self.cold_start_var.set(self.game.settings.cold_start)
 
+        self.parallel_generation_var = BooleanVar()
+        self.parallel_generation_var.set(self.game.settings.parallel_mission_generation)
+
     def dismiss(self):
         self.game.settings.player_skill = self.player_skill_var.get()
         self.game.settings.enemy_skill = self.enemy_skill_var.get()
@@ -37,6 +40,8 @@ class ConfigurationMenu(Menu):
         self.game.settings.only_player_takeoff = self.takeoff_var.get()
         self.game.settings.night_disabled = self.night_var.get()
         self.game.settings.cold_start = self.cold_start_var.get()
+        self.game.settings.parallel_mission_generation = self.parallel_generation_var.get()
+        self.game.mark_dirty()
         super(ConfigurationMenu, self).dismiss()
 
     def display(self):
@@ -84,6 +89,10 @@ class ConfigurationMenu(Menu):
         Checkbutton(body, variable=self.night_var, **STYLES["radiobutton"]).grid(row=row, column=1, sticky=E)
         row += 1
 
+        Label(body, text="Generate quick mission in parallel", **STYLES["widget"]).grid(row=row, column=0, sticky=W)
+        Checkbutton(body, variable=self.parallel_generation_var, **STYLES["radiobutton"]).grid(row=row, column=1, sticky=E)
+        row += 1
+
         Button(body, text="Display logs", command=self.display_logs, **STYLES["btn-primary"]).grid(row=row, column=1, sticky=E, pady=30)
         row += 1
 
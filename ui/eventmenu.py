@@ -205,6 +205,5 @@ class EventMenu(Menu):
         else:
             self.event.player_defending(flights)
 
-        self.game.initiate_event(self.event)
         EventResultsMenu(self.window, self.parent, self.game, self.event).display()
 
@@ -1,3 +1,6 @@
+import queue
+import threading
+
 from tkinter.ttk import *
 from ui.window import *
 
@@ -5,6 +8,9 @@ from game.game import *
 from userdata.debriefing import *
 from .styles import STYLES
 
+# interval in ms in which generation progress is checked from the UI thread
+GENERATION_POLL_INTERVAL = 100
+
 
 class EventResultsMenu(Menu):
     debriefing = None  # type: Debriefing
@@ -17,8 +23,64 @@ class EventResultsMenu(Menu):
         self.frame.grid_rowconfigure(0, weight=0)
         self.event = event
         self.finished = False
-
-        wait_for_debriefing(callback=self.process_debriefing)
+        self.watcher = None  # type: DebriefingWatcher
+
+        self.generating = True
+        self.generation_stage = "Preparing"
+        self.generation_stage_label = None  # type: Label
+        self.generation_queue = queue.Queue()
+        self.generation_cancelled = threading.Event()
+
+        threading.Thread(target=self.generate, daemon=True).start()
+        self.window.tk.after(GENERATION_POLL_INTERVAL, self.poll_generation)
+
+    def report_progress(self, stage: str):
+        # called from the generation thread
+        if self.generation_cancelled.is_set():
+            raise GenerationCancelled()
+
+        self.generation_queue.put(("progress", stage))
+
+    def generate(self):
+        try:
+            self.game.initiate_event(self.event, progress=self.report_progress)
+            self.generation_queue.put(("finished", None))
+        except GenerationCancelled:
+            self.generation_queue.put(("cancelled", None))
+        except Exception as e:
+            self.generation_queue.put(("failed", e))
+
+    def poll_generation(self):
+        while not self.generation_queue.empty():
+            status, value = self.generation_queue.get()
+            if status == "progress":
+                self.generation_stage = value
+                if self.generation_stage_label:
+                    self.generation_stage_label["text"] = value
+            elif status == "finished":
+                self.generating = False
+                self.watcher = wait_for_debriefing(callback=self.process_debriefing)
+                self.display()
+                return
+            elif status == "cancelled":
+                if self.event.is_awacs_enabled:
+                    self.game.awacs_expense_refund()
+                self.parent.display()
+                return
+            elif status == "failed":
+                if self.event.is_awacs_enabled:
+                    self.game.awacs_expense_refund()
+                self.parent.display()
+                logging.error("Generation of {} failed".format(self.event), exc_info=value)
+
+                # re-raised on the UI thread to be handled as any other error
+                raise value
+
+        self.window.tk.after(GENERATION_POLL_INTERVAL, self.poll_generation)
+
+    def cancel_generation(self):
+        self.generation_cancelled.set()
+        self.generation_stage_label["text"] = "Cancelling..."
 
     def display(self):
         self.window.clear_right_pane()
@@ -37,7 +99,22 @@ class EventResultsMenu(Menu):
             Label(self.frame, text=text, **STYLES[style]).grid(row=row, column=0, sticky=NW, columnspan=2)
             row += 1
 
-        if not self.finished:
+        if self.generating:
+            header("Generating mission...")
+
+            self.generation_stage_label = Label(self.frame, text=self.generation_stage, **STYLES["italic"])
+            self.generation_stage_label.grid(row=row, column=0, sticky=NW, columnspan=2)
+            row += 1
+
+            pg = Progressbar(self.frame, orient="horizontal", length=200, mode="indeterminate")
+            pg.grid(row=row, column=0, columnspan=2, sticky=EW, pady=5, padx=5)
+            pg.start(10)
+            row += 1
+
+            Button(self.frame, text="Cancel", command=self.cancel_generation, **STYLES["btn-danger"]).grid(columnspan=1, row=row)
+            row += 1
+
+        elif not self.finished:
 
             header("You are clear for takeoff!")
 
@@ -104,11 +181,16 @@ class EventResultsMenu(Menu):
             Button(self.frame, text="Okay", command=self.dismiss, **STYLES["btn-primary"]).grid(columnspan=1, row=row)
             row += 1
 
+    def dismiss(self):
+        if self.watcher:
+            self.watcher.cancel()
+        super(EventResultsMenu, self).dismiss()
+
     def process_debriefing(self, debriefing: Debriefing):
         self.debriefing = debriefing
 
-        debriefing.calculate_units(regular_mission=self.event.operation.regular_mission,
-                                   quick_mission=self.event.operation.quick_mission,
+        debriefing.calculate_units(regular_manifest=self.event.operation.regular_manifest,
+                                   quick_manifest=self.event.operation.quick_manifest,
                                    player_name=self.game.player,
                                    enemy_name=self.game.enemy)
 
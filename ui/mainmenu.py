@@ -1,4 +1,5 @@
 from game.game import *
+from game.quickmission import prepare_quick_mission_worker
 from ui.basemenu import *
 from ui.configurationmenu import *
 from ui.overviewcanvas import *
@@ -24,7 +25,9 @@ class MainMenu(Menu):
         self.frame.rowconfigure(1, weight=1)
 
     def display(self):
-        persistency.save_game(self.game)
+        persistency.request_save(self.game)
+        if self.game.settings.parallel_mission_generation:
+            prepare_quick_mission_worker()
 
         self.window.clear_right_pane()
         self.upd.update()
@@ -1,12 +1,17 @@
 import logging
 import typing
+import json
 import re
 import threading
-import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import sys
 import os
 
-from dcs.lua import parse
 from dcs.mission import Mission
+from dcs.lua import parse as lua
 
 from dcs.unit import Vehicle, Ship
 from dcs.vehicles import vehicle_map
@@ -20,43 +25,261 @@ from .persistency import base_path
 from theater.theatergroundobject import CATEGORY_MAP
 
 DEBRIEFING_LOG_EXTENSION = "log"
+MISSION_MANIFEST_EXTENSION = ".manifest"
+
+# categories of the unit groups which units are counted as alive in the debriefing
+MANIFEST_COUNTED_CATEGORIES = ["plane", "vehicle", "ship"]
+
+# interval between directory scans when no change notification mechanism is available
+DEBRIEFING_POLL_INTERVAL = 3
+# interval in which blocking waits for change notifications check for cancellation
+DEBRIEFING_WAIT_INTERVAL = 0.5
+# log is handed off once it's size and modification time stay the same over this interval
+DEBRIEFING_SETTLE_INTERVAL = 1
+
+INOTIFY_IN_CLOSE_WRITE = 0x00000008
+INOTIFY_IN_MOVED_TO = 0x00000080
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+WIN_FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+WIN_FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+WIN_WAIT_OBJECT_0 = 0x00000000
+WIN_WAIT_TIMEOUT = 0x00000102
+
+
+DEBRIEFING_READ_CHUNK_SIZE = 64 * 1024
+# tokens ending closer than that to the end of the read data could still continue in the next chunk,
+# i.e. "1.5" followed by "e+2" or "0" followed by "x1F"
+DEBRIEFING_TOKEN_LOOKAHEAD = 3
+DEBRIEFING_DEAD_EVENT_TYPES = ["crash", "dead"]
+
+# every match is a single token with whitespace and comments before it skipped
+_LUA_TOKEN = re.compile(r"""
+    (?:\s+|--[^\n]*\n)*
+    (?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        |(?P<number>-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?))
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+        |(?P<punct>[{}\[\]=,;])
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_LUA_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_LUA_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+_LUA_CONSTANTS = {"true": True, "false": False, "nil": None}
+
+_PARSER_FIELD = 0
+_PARSER_KEY = 1
+_PARSER_KEY_CLOSE = 2
+_PARSER_EQUALS = 3
+_PARSER_VALUE = 4
+_PARSER_SEPARATOR = 5
+
+# parser table frame fields
+_FRAME_RESULT = 0
+_FRAME_CAPTURE = 1
+_FRAME_EVENTS = 2
+_FRAME_INDEX = 3
+_FRAME_KEY = 4
+
+
+class DebriefingParseError(Exception):
+    pass
+
+
+def _lua_number(value: str) -> typing.Union[int, float]:
+    if value.lstrip("-")[:2].lower() == "0x":
+        return int(value, 16)
+    elif any(x in value for x in ".eE"):
+        return float(value)
+    else:
+        return int(value)
+
+
+def _lua_tokens(f: typing.TextIO) -> typing.Iterator[typing.List[typing.Tuple[str, typing.Any]]]:
+    """
+    Tokenizes lua table file chunk by chunk, yielding tokens of each chunk.
+    Only current chunk and incomplete token carried over from the previous one are kept in memory.
+    """
+    match = _LUA_TOKEN.match
+    buffer = ""
+    eof = False
+    while not eof:
+        chunk = f.read(DEBRIEFING_READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+        tokens = []
+        position = 0
+        length = len(buffer)
+        while True:
+            m = match(buffer, position)
+            if m is None or (length - m.end() < DEBRIEFING_TOKEN_LOOKAHEAD and not eof):
+                # token could continue in the next chunk
+                break
 
-
-def parse_mutliplayer_debriefing(contents: str):
-    result = {}
-    element = None
-
-    in_events = False
-
-    for line in [x.strip() for x in contents.splitlines()]:
-        if line.startswith("events ="):
-            in_events = True
-        elif line.startswith("} -- end of events"):
-            in_events = False
-
-        if not in_events:
-            continue
-
-        key = None
-        if line.startswith("initiator\t"):
-            key = "initiator"
-            if element is None:
-                element = {}
-        elif line.startswith("type\t"):
-            key = "type"
-            if element is None:
-                element = {}
-        elif line.startswith("}, -- end of ["):
-            result[len(result)] = element
-            element = None
-            continue
+            position = m.end()
+            kind = m.lastgroup
+            value = m.group(kind)
+            if kind == "string":
+                value = value[1:-1]
+                if "\\" in value:
+                    value = _LUA_ESCAPE.sub(lambda x: _LUA_ESCAPES.get(x.group(1), x.group(1)), value)
+            elif kind == "number":
+                value = _lua_number(value)
+            elif kind == "name" and value in _LUA_CONSTANTS:
+                kind = "constant"
+                value = _LUA_CONSTANTS[value]
+
+            tokens.append((kind, value))
+
+        yield tokens
+        buffer = buffer[position:]
+
+    rest = buffer.strip()
+    if rest and not (rest.startswith("--") and "\n" not in rest):
+        raise DebriefingParseError("unexpected {!r}".format(rest[:20]))
+
+
+class _DebriefingLogParser:
+    """
+    Single pass parser for debriefing logs. Only tables of events and triggers_state are materialized,
+    each event is handed to on_event as soon as it is read and everything else is skipped.
+    """
+    def __init__(self, f: typing.TextIO, on_event: typing.Callable[[typing.Dict], None]):
+        self.f = f
+        self.on_event = on_event
+        self.trigger_state = {}
+
+    def _set_field(self, frame: typing.List, value: typing.Any):
+        if frame[_FRAME_RESULT] is not None:
+            frame[_FRAME_RESULT][frame[_FRAME_KEY]] = value
+        if frame[_FRAME_EVENTS] and isinstance(value, dict):
+            self.on_event(value)
+
+    def _open_table(self, parent: typing.List) -> typing.List:
+        key = parent[_FRAME_KEY]
+        if parent[_FRAME_CAPTURE]:
+            return [{}, True, False, 1, None]
+        elif key == "events":
+            return [None, True, True, 1, None]
+        elif key == "triggers_state":
+            return [self.trigger_state, True, False, 1, None]
         else:
-            continue
+            return [None, False, False, 1, None]
+
+    def parse(self):
+        # top level is a table of name = value statements without braces
+        stack = [[None, False, False, 1, None]]
+        frame = stack[0]
+        state = _PARSER_FIELD
+
+        for tokens in _lua_tokens(self.f):
+            for kind, value in tokens:
+                if state == _PARSER_VALUE or (state == _PARSER_FIELD and kind != "name" and len(stack) > 1):
+                    if state == _PARSER_FIELD:
+                        if kind == "punct" and value == "}":
+                            stack.pop()
+                            self._set_field(stack[-1], frame[_FRAME_RESULT])
+                            frame = stack[-1]
+                            state = _PARSER_SEPARATOR if len(stack) > 1 else _PARSER_FIELD
+                            continue
+                        elif kind == "punct" and value == "[":
+                            state = _PARSER_KEY
+                            continue
+
+                        frame[_FRAME_KEY] = frame[_FRAME_INDEX]
+                        frame[_FRAME_INDEX] += 1
+
+                    if kind == "punct":
+                        if value != "{":
+                            raise DebriefingParseError("unexpected {!r}".format(value))
+                        frame = self._open_table(frame)
+                        stack.append(frame)
+                        state = _PARSER_FIELD
+                    else:
+                        self._set_field(frame, value)
+                        state = _PARSER_SEPARATOR if len(stack) > 1 else _PARSER_FIELD
+                elif state == _PARSER_SEPARATOR:
+                    if kind == "punct" and value in ",;":
+                        state = _PARSER_FIELD
+                    elif kind == "punct" and value == "}":
+                        stack.pop()
+                        self._set_field(stack[-1], frame[_FRAME_RESULT])
+                        frame = stack[-1]
+                        state = _PARSER_SEPARATOR if len(stack) > 1 else _PARSER_FIELD
+                    else:
+                        raise DebriefingParseError("expected separator, got {!r}".format(value))
+                elif state == _PARSER_FIELD:
+                    if kind != "name":
+                        raise DebriefingParseError("expected name, got {!r}".format(value))
+                    frame[_FRAME_KEY] = value
+                    state = _PARSER_EQUALS
+                elif state == _PARSER_KEY:
+                    if kind == "punct":
+                        raise DebriefingParseError("unexpected {!r}".format(value))
+                    frame[_FRAME_KEY] = value
+                    state = _PARSER_KEY_CLOSE
+                elif state == _PARSER_KEY_CLOSE:
+                    if kind != "punct" or value != "]":
+                        raise DebriefingParseError("expected ], got {!r}".format(value))
+                    state = _PARSER_EQUALS
+                elif state == _PARSER_EQUALS:
+                    if kind != "punct" or value != "=":
+                        raise DebriefingParseError("expected =, got {!r}".format(value))
+                    state = _PARSER_VALUE
+
+        if len(stack) > 1 or state != _PARSER_FIELD:
+            raise DebriefingParseError("unexpected end of file")
+
+
+def manifest_path_for(mission_path: str) -> str:
+    return mission_path + MISSION_MANIFEST_EXTENSION
+
+
+class MissionManifest:
+    """
+    Maps mission ids of the generated mission units to what they represent, so that debriefing could be resolved
+    without the generated mission. Written alongside the .miz file.
+
+    units: mission id -> (country name, group category, unit type name, group name)
+    statics: mission id of the first unit in the group -> (country name, group name, which is the ground object identifier)
+    """
+    def __init__(self, units: typing.Dict[int, typing.Tuple[str, str, str, str]], statics: typing.Dict[int, typing.Tuple[str, str]]):
+        self.units = units
+        self.statics = statics
 
-        value = re.findall(r"=\s*\"(.*?)\",", line)[0]
-        element[key] = value
+    @classmethod
+    def from_mission(cls, mission: Mission) -> "MissionManifest":
+        units = {}
+        statics = {}
+        for coalition in mission.coalition.values():
+            for country in coalition.countries.values():
+                for category, groups in [("plane", country.plane_group),
+                                         ("helicopter", country.helicopter_group),
+                                         ("vehicle", country.vehicle_group),
+                                         ("ship", country.ship_group)]:
+                    for group in groups:
+                        for unit in group.units:
+                            unit_type_name = db.unit_type_name(db.unit_type_of(unit))
+                            units[unit.id] = (country.name, category, unit_type_name, str(group.name))
+
+                for group in country.static_group:
+                    statics[group.units[0].id] = (country.name, str(group.name))
+
+        return cls(units, statics)
 
-    return {"debriefing": {"events": result}}
+    @classmethod
+    def load(cls, path: str) -> "MissionManifest":
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        return cls({int(k): tuple(v) for k, v in data["units"].items()},
+                   {int(k): tuple(v) for k, v in data["statics"].items()})
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"units": self.units, "statics": self.statics}, f, separators=(",", ":"))
 
 
 class Debriefing:
@@ -71,15 +294,17 @@ class Debriefing:
     @classmethod
     def parse(cls, path: str):
         dead_units = []
+        dead_units_set = set()
 
         def append_dead_object(object_mission_id_str):
             nonlocal dead_units
             object_mission_id = int(object_mission_id_str)
-            if object_mission_id in dead_units:
+            if object_mission_id in dead_units_set:
                 logging.info("debriefing: failed to append_dead_object {}: already exists!".format(object_mission_id))
                 return
 
             dead_units.append(object_mission_id)
+            dead_units_set.add(object_mission_id)
 
         def parse_dead_object(event):
             try:
@@ -87,82 +312,81 @@ class Debriefing:
             except Exception as e:
                 logging.error(e)
 
-        with open(path, "r") as f:
-            table_string = f.read()
+        def parse_event(event):
+            if event.get("type", None) in DEBRIEFING_DEAD_EVENT_TYPES:
+                parse_dead_object(event)
+
+        try:
+            with open(path, "r") as f:
+                parser = _DebriefingLogParser(f, on_event=parse_event)
+                parser.parse()
+                trigger_state = parser.trigger_state
+        except DebriefingParseError as e:
+            logging.warning("debriefing: streaming parse of {} failed ({}), falling back to full file parse".format(path, e))
+
+            with open(path, "r") as f:
+                contents = f.read()
+
             try:
-                table = parse.loads(table_string)
+                table = lua.loads(contents)
             except Exception as e:
-                table = parse_mutliplayer_debriefing(table_string)
-
-            events = table.get("debriefing", {}).get("events", {})
-            for event in events.values():
-                event_type = event.get("type", None)
-                if event_type in ["crash", "dead"]:
-                    parse_dead_object(event)
+                raise DebriefingParseError("failed to parse {}: {}".format(path, e))
 
+            # events read before the error are read again
+            dead_units.clear()
+            dead_units_set.clear()
+            for event in table.get("debriefing", {}).get("events", {}).values():
+                parse_event(event)
             trigger_state = table.get("debriefing", {}).get("triggers_state", {})
 
         return Debriefing(dead_units, trigger_state)
 
-    def calculate_units(self, regular_mission: Mission, quick_mission: Mission, player_name: str, enemy_name: str):
-        def count_groups(groups: typing.List[UnitType]) -> typing.Dict[UnitType, int]:
-            result = {}
-            for group in groups:
-                for unit in group.units:
-                    unit_type = db.unit_type_of(unit)
-                    if unit_type in db.EXTRA_AA.values():
-                        continue
-
-                    result[unit_type] = result.get(unit_type, 0) + 1
-
-            return result
-
-        mission = regular_mission if len(self._trigger_state) else quick_mission
-
-        player = mission.country(player_name)
-        enemy = mission.country(enemy_name)
-        
-        player_units = count_groups(player.plane_group + player.vehicle_group + player.ship_group)
-        enemy_units = count_groups(enemy.plane_group + enemy.vehicle_group + enemy.ship_group)
+    def calculate_units(self, regular_manifest: MissionManifest, quick_manifest: MissionManifest, player_name: str, enemy_name: str):
+        manifest = regular_manifest if len(self._trigger_state) else quick_manifest
 
         self.destroyed_units = {
-            player.name: {},
-            enemy.name: {},
+            player_name: {},
+            enemy_name: {},
         }
 
-        all_groups = {
-            player.name: player.plane_group + player.helicopter_group + player.vehicle_group + player.ship_group,
-            enemy.name: enemy.plane_group + enemy.helicopter_group + enemy.vehicle_group + enemy.ship_group,
+        units = {
+            player_name: {},
+            enemy_name: {},
         }
 
-        static_groups = enemy.static_group
+        for country_name, category, unit_type_name, _ in manifest.units.values():
+            if country_name not in units or category not in MANIFEST_COUNTED_CATEGORIES:
+                continue
+
+            unit_type = db.unit_type_from_name(unit_type_name)
+            if unit_type in db.EXTRA_AA.values():
+                continue
 
-        for country_name, country_groups in all_groups.items():
-            for group in country_groups:
-                for unit in group.units:
-                    if unit.id in self._dead_units:
-                        unit_type = db.unit_type_of(unit)
-                        logging.info("debriefing: found dead unit {} ({}, {})".format(str(unit.name), unit.id, unit_type))
+            units[country_name][unit_type] = units[country_name].get(unit_type, 0) + 1
 
-                        assert country_name
-                        assert unit_type
-                        self.destroyed_units[country_name][unit_type] = self.destroyed_units[country_name].get(unit_type, 0) + 1
-                        self._dead_units.remove(unit.id)
+        unsatisfied = []
+        for identifier in self._dead_units:
+            if identifier in manifest.units and manifest.units[identifier][0] in self.destroyed_units:
+                country_name, _, unit_type_name, group_name = manifest.units[identifier]
+                unit_type = db.unit_type_from_name(unit_type_name)
+                logging.info("debriefing: found dead unit {} of {} ({}, {})".format(identifier, group_name, unit_type_name, country_name))
 
-        for group in static_groups:
-            identifier = group.units[0].id
-            if identifier in self._dead_units:
-                logging.info("debriefing: found dead static {} ({})".format(str(group.name), identifier))
+                assert unit_type
+                self.destroyed_units[country_name][unit_type] = self.destroyed_units[country_name].get(unit_type, 0) + 1
+            elif identifier in manifest.statics and manifest.statics[identifier][0] == enemy_name:
+                group_name = manifest.statics[identifier][1]
+                logging.info("debriefing: found dead static {} ({})".format(group_name, identifier))
 
-                assert str(group.name)
-                self.destroyed_objects.append(str(group.name))
-                self._dead_units.remove(identifier)
+                assert group_name
+                self.destroyed_objects.append(group_name)
+            else:
+                unsatisfied.append(identifier)
 
-        logging.info("debriefing: unsatistied ids: {}".format(self._dead_units))
+        logging.info("debriefing: unsatistied ids: {}".format(unsatisfied))
 
         self.alive_units = {
-            player.name: {k: v - self.destroyed_units[player.name].get(k, 0) for k, v in player_units.items()},
-            enemy.name: {k: v - self.destroyed_units[enemy.name].get(k, 0) for k, v in enemy_units.items()},
+            country_name: {k: v - self.destroyed_units[country_name].get(k, 0) for k, v in country_units.items()}
+            for country_name, country_units in units.items()
         }
 
 
@@ -179,22 +403,189 @@ def _logfiles_snapshot() -> typing.Dict[str, float]:
     return result
 
 
-def _poll_new_debriefing_log(snapshot: typing.Dict[str, float], callback: typing.Callable):
-    should_run = True
-    while should_run:
-        for file, timestamp in _logfiles_snapshot().items():
-            if file not in snapshot or timestamp != snapshot[file]:
-                debriefing = Debriefing.parse(os.path.join(debriefing_directory_location(), file))
-                callback(debriefing)
-                should_run = False
-                break
+class DebriefingWatcher:
+    """
+    Waits for the new debriefing log in background thread and calls callback with the parsed debriefing.
+    Uses inotify (Linux) or directory change notifications (Windows) when available and falls back to polling.
+    """
+    def __init__(self, callback: typing.Callable):
+        self.callback = callback
+        self._snapshot = _logfiles_snapshot()
+        self._cancelled = threading.Event()
+        self._thread = None  # type: threading.Thread
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self):
+        waits = [self._wait_inotify, self._wait_windows, self._wait_polling]
+        while not self.is_cancelled:
+            path = None
+            while waits:
+                try:
+                    path = waits[0]()
+                    break
+                except OSError as e:
+                    logging.info("debriefing: {} unavailable ({}), falling back".format(waits[0].__name__, e))
+                    waits.pop(0)
+
+            if path is None or not self._wait_until_written(path):
+                return
+
+            try:
+                debriefing = Debriefing.parse(path)
+            except (DebriefingParseError, OSError) as e:
+                # wait for the log to be saved again instead of committing a partial debriefing
+                logging.error("debriefing: {}".format(e))
+                self._snapshot = _logfiles_snapshot()
+                continue
+
+            if not self.is_cancelled:
+                self.callback(debriefing)
+            return
+
+    def _wait_until_written(self, path: str) -> bool:
+        """
+        Change notifications (and polling) could catch the log while DCS is still writing it,
+        so it's only handed off once it stopped changing.
+        """
+        def file_state():
+            try:
+                stat = os.stat(path)
+                return stat.st_size, stat.st_mtime
+            except OSError:
+                return None
 
-        time.sleep(3)
+        state = file_state()
+        while not self.is_cancelled:
+            self._cancelled.wait(DEBRIEFING_SETTLE_INTERVAL)
+            new_state = file_state()
+            if new_state is not None and new_state == state:
+                return True
+            state = new_state
 
+        return False
 
-def wait_for_debriefing(callback: typing.Callable):
+    def _is_new_log(self, file: str, timestamp: float) -> bool:
+        if not file.endswith("." + DEBRIEFING_LOG_EXTENSION):
+            return False
+
+        return file not in self._snapshot or timestamp != self._snapshot[file]
+
+    def _find_new_log(self) -> typing.Optional[str]:
+        for file, timestamp in _logfiles_snapshot().items():
+            if self._is_new_log(file, timestamp):
+                return os.path.join(debriefing_directory_location(), file)
+
+        return None
+
+    def _wait_polling(self) -> typing.Optional[str]:
+        while not self.is_cancelled:
+            path = self._find_new_log()
+            if path:
+                return path
+
+            self._cancelled.wait(DEBRIEFING_POLL_INTERVAL)
+
+        return None
+
+    def _wait_inotify(self) -> typing.Optional[str]:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is not supported on {}".format(sys.platform))
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        try:
+            # log is handled once DCS closes it, or once it is moved into the directory
+            mask = INOTIFY_IN_CLOSE_WRITE | INOTIFY_IN_MOVED_TO
+            if libc.inotify_add_watch(fd, debriefing_directory_location().encode(sys.getfilesystemencoding()), mask) < 0:
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+            # file could've been written between the snapshot and the watch setup
+            path = self._find_new_log()
+            while not path and not self.is_cancelled:
+                readable, _, _ = select.select([fd], [], [], DEBRIEFING_WAIT_INTERVAL)
+                if not readable:
+                    continue
+
+                data = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(data):
+                    _, _, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                    offset += INOTIFY_EVENT_HEADER.size
+                    name = data[offset:offset + name_length].rstrip(b"\0").decode(sys.getfilesystemencoding())
+                    offset += name_length
+
+                    if not name:
+                        continue
+
+                    # other files in the directory (or logs already there before the mission) are not the result
+                    candidate = os.path.join(debriefing_directory_location(), name)
+                    try:
+                        timestamp = os.path.getmtime(candidate)
+                    except OSError:
+                        continue
+
+                    if self._is_new_log(name, timestamp):
+                        path = candidate
+                        break
+
+            return path
+        finally:
+            os.close(fd)
+
+    def _wait_windows(self) -> typing.Optional[str]:
+        if sys.platform != "win32":
+            raise OSError("directory change notifications are not supported on {}".format(sys.platform))
+
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        kernel32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        kernel32.WaitForSingleObject.restype = wintypes.DWORD
+
+        mask = WIN_FILE_NOTIFY_CHANGE_FILE_NAME | WIN_FILE_NOTIFY_CHANGE_LAST_WRITE
+        handle = kernel32.FindFirstChangeNotificationW(debriefing_directory_location(), False, mask)
+        if handle is None or handle == wintypes.HANDLE(-1).value:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        try:
+            path = self._find_new_log()
+            while not path and not self.is_cancelled:
+                result = kernel32.WaitForSingleObject(handle, int(DEBRIEFING_WAIT_INTERVAL * 1000))
+                if result == WIN_WAIT_TIMEOUT:
+                    continue
+                elif result != WIN_WAIT_OBJECT_0:
+                    raise ctypes.WinError(ctypes.get_last_error())
+
+                # directory scan only happens when something actually changed
+                path = self._find_new_log()
+                if not kernel32.FindNextChangeNotification(handle):
+                    raise ctypes.WinError(ctypes.get_last_error())
+
+            return path
+        finally:
+            kernel32.FindCloseChangeNotification(handle)
+
+
+def wait_for_debriefing(callback: typing.Callable) -> DebriefingWatcher:
     if not os.path.exists(debriefing_directory_location()):
         os.mkdir(debriefing_directory_location())
 
-    threading.Thread(target=_poll_new_debriefing_log, args=(_logfiles_snapshot(), callback)).start()
-
+    watcher = DebriefingWatcher(callback)
+    watcher.start()
+    return watcher
@@ -0,0 +1,70 @@
+import importlib.util
+import threading
+import builtins
+import logging
+import typing
+import time
+import sys
+
+"""
+Import time report, enabled with the --import-report command line switch. Should be imported before anything else:
+time spent loading each module is recorded from then on and written to the log once startup is done. Cumulative time
+includes the modules imported by the module, self time doesn't (same as with python -X importtime).
+"""
+
+IMPORT_REPORT_SWITCH = "--import-report"
+IMPORT_REPORT_LENGTH = 40
+
+_original_import = builtins.__import__
+_records = {}  # type: typing.Dict[str, typing.List[float]]
+_local = threading.local()
+
+
+def _module_name(name: str, globals, level: int) -> str:
+    if not level:
+        return name
+
+    try:
+        return importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+    except (ImportError, ValueError):
+        return name
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    module_name = _module_name(name, globals, level)
+    if module_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    # time spent in nested imports of the module, which is not included into it's self time
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(0.0)
+
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+
+        record = _records.setdefault(module_name, [0.0, 0.0])
+        record[0] += elapsed - nested
+        record[1] += elapsed
+
+
+def report():
+    if builtins.__import__ is not _timed_import:
+        return
+
+    builtins.__import__ = _original_import
+
+    records = sorted(_records.items(), key=lambda x: x[1][1], reverse=True)
+    logging.info("Import report: {} modules imported".format(len(records)))
+    logging.info("{:>10} {:>10}  {}".format("self ms", "total ms", "module"))
+    for module_name, (self_time, cumulative) in records[:IMPORT_REPORT_LENGTH]:
+        logging.info("{:>10.1f} {:>10.1f}  {}".format(self_time * 1000, cumulative * 1000, module_name))
+
+
+if IMPORT_REPORT_SWITCH in sys.argv:
+    builtins.__import__ = _timed_import
@@ -6,6 +6,8 @@ from io import StringIO
 from tkinter import *
 from tkinter.scrolledtext import *
 
+from userdata import profiling
+
 _version_string = None
 
 
@@ -43,3 +45,6 @@ else:
     Tk.report_callback_exception = _handle_exception
 
 logging.info("DCS Libration {}".format(_version_string))
+
+if profiling.is_enabled():
+    logging.info("Mission generation profiling is enabled, records are written to {}".format(profiling.PROFILE_FILE_NAME))
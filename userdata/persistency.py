@@ -1,12 +1,30 @@
+import threading
 import logging
+import atexit
 import typing
 import pickle
+import json
+import gzip
 import os
 import sys
 import shutil
 
+# gzip stream magic, used to tell schema saves from legacy pickled ones
+GZIP_MAGIC = b"\x1f\x8b"
+
+# amount of journal records after which journal is compacted into the new snapshot
+JOURNAL_COMPACT_RECORDS = 25
+
 _user_folder = None  # type: str
 
+# last persisted state of the campaign, journal records are diffs against it
+_journal_game = None
+_journal_state = None  # type: typing.Dict
+_journal_sequence = 0
+_snapshot_sequence = 0
+
+_save_worker = None  # type: SaveWorker
+
 
 def setup(user_folder: str):
     global _user_folder
@@ -32,6 +50,14 @@ def _temporary_save_file() -> str:
     return os.path.join(base_path(), "liberation_save_tmp")
 
 
+def _backup_save_file() -> str:
+    return os.path.join(base_path(), "liberation_save_backup")
+
+
+def _journal_file() -> str:
+    return os.path.join(base_path(), "liberation_save_journal")
+
+
 def _save_file_exists() -> bool:
     return os.path.exists(_save_file())
 
@@ -40,20 +66,207 @@ def mission_path_for(name: str) -> str:
     return os.path.join(base_path(), "Missions", "{}".format(name))
 
 
+def cache_path_for(name: str) -> typing.Optional[str]:
+    """
+    Path for the cached data in the user folder, or None if user folder is not set up (i.e. in tools).
+    """
+    if not _user_folder:
+        return None
+
+    return os.path.join(base_path(), "liberation_cache", name)
+
+
+def _read_journal(snapshot_sequence: int) -> typing.List[typing.Dict]:
+    if not os.path.exists(_journal_file()):
+        return []
+
+    records = []
+    valid_length = 0
+    with open(_journal_file(), "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                record = None
+
+            if record is None or not line.endswith(b"\n"):
+                # incomplete last record, save was interrupted mid-write
+                logging.warning("Discarding incomplete journal record")
+                break
+
+            valid_length += len(line)
+            if record["sequence"] > snapshot_sequence:
+                records.append(record)
+
+    if valid_length != os.path.getsize(_journal_file()):
+        with open(_journal_file(), "r+b") as f:
+            f.truncate(valid_length)
+
+    return records
+
+
+def _write_snapshot(state: typing.Dict):
+    global _snapshot_sequence
+
+    state = dict(state, journal_sequence=_journal_sequence)
+    with open(_temporary_save_file(), "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+            gz.write(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+    if _save_file_exists():
+        shutil.copyfile(_save_file(), _backup_save_file())
+
+    os.replace(_temporary_save_file(), _save_file())
+    _snapshot_sequence = _journal_sequence
+
+    # records up to the snapshot sequence are ignored on restore even if truncation did not happen
+    open(_journal_file(), "w").close()
+
+
+def _append_journal(diff: typing.Dict):
+    global _journal_sequence
+
+    _journal_sequence += 1
+    record = dict(diff, sequence=_journal_sequence)
+    with open(_journal_file(), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
 def restore_game():
+    global _journal_game, _journal_state, _journal_sequence, _snapshot_sequence
+    from userdata.savegame import deserialize_game, apply_game_state_diff
+
     if not _save_file_exists():
         return None
 
     with open(_save_file(), "rb") as f:
-        return pickle.load(f)
+        if f.read(len(GZIP_MAGIC)) != GZIP_MAGIC:
+            # legacy whole-object pickle
+            f.seek(0)
+            return pickle.load(f)
+
+    with gzip.open(_save_file(), "rt", encoding="utf-8") as f:
+        state = json.load(f)
+
+    snapshot_sequence = state.pop("journal_sequence", 0)
+    sequence = snapshot_sequence
+    for record in _read_journal(snapshot_sequence):
+        apply_game_state_diff(state, record)
+        sequence = record["sequence"]
+
+    game = deserialize_game(state)
+    game.mark_saved()
+    _journal_game, _journal_state = game, state
+    _journal_sequence, _snapshot_sequence = sequence, snapshot_sequence
+    return game
+
+
+def _persist_state(game, state: typing.Dict):
+    global _journal_game, _journal_state
+    from userdata.savegame import diff_game_state
+
+    diff = None
+    if game is _journal_game and _journal_state is not None:
+        diff = diff_game_state(_journal_state, state)
+
+    if diff is None or _journal_sequence - _snapshot_sequence >= JOURNAL_COMPACT_RECORDS:
+        _write_snapshot(state)
+    elif diff["game"] or diff["controlpoints"]:
+        _append_journal(diff)
+
+    _journal_game, _journal_state = game, state
 
 
 def save_game(game) -> bool:
+    from userdata.savegame import serialize_game
+
     try:
-        with open(_temporary_save_file(), "wb") as f:
-            pickle.dump(game, f)
-        shutil.copy(_temporary_save_file(), _save_file())
+        flush_saves()
+        _persist_state(game, serialize_game(game))
+        game.mark_saved()
         return True
     except Exception as e:
         logging.error(e)
         return False
+
+
+class SaveWorker:
+    """
+    Writes saves in the background. Requests made while previous save is being written are coalesced:
+    only the most recent state is written once the worker is free.
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None  # type: typing.Tuple[typing.Any, typing.Dict]
+        self._busy = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, game, state: typing.Dict):
+        with self._condition:
+            self._pending = game, state
+            self._condition.notify_all()
+
+    def flush(self):
+        with self._condition:
+            while self._pending or self._busy:
+                self._condition.wait()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                (game, state), self._pending = self._pending, None
+                self._busy = True
+
+            try:
+                _persist_state(game, state)
+            except Exception as e:
+                logging.error(e)
+                # save will be retried on the next request
+                game.mark_dirty()
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+
+def request_save(game):
+    """
+    Saves the game in the background if it changed since the last save. State is captured right away, so the game
+    could be modified while the save is being written.
+    """
+    global _save_worker
+    from userdata.savegame import serialize_game
+
+    if not game.is_dirty:
+        return
+
+    try:
+        state = serialize_game(game)
+    except Exception as e:
+        logging.error(e)
+        return
+
+    game.mark_saved()
+    if _save_worker is None:
+        _save_worker = SaveWorker()
+    _save_worker.submit(game, state)
+
+
+def flush_saves():
+    """
+    Blocks until all of the requested saves are written.
+    """
+    if _save_worker:
+        _save_worker.flush()
+
+
+# pending save should be written before the worker thread is stopped on exit
+atexit.register(flush_saves)
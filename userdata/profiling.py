@@ -0,0 +1,107 @@
+import contextlib
+import datetime
+import logging
+import typing
+import json
+import time
+import sys
+import os
+
+from userdata import persistency
+
+"""
+Opt-in mission generation profiling, enabled with the --profile-generation command line switch. Each generated
+mission gets a record appended to the profile file in the user folder: time, landmap queries and groups created
+by each of the generation stages. Nested stages are named by their path, i.e. "generate/triggersgen".
+"""
+
+PROFILE_SWITCH = "--profile-generation"
+PROFILE_FILE_NAME = "liberation_generation_profile.jsonl"
+
+
+def is_enabled() -> bool:
+    return PROFILE_SWITCH in sys.argv
+
+
+def profile_path() -> str:
+    return os.path.join(persistency.base_path(), PROFILE_FILE_NAME)
+
+
+def _groups_count(mission) -> int:
+    if mission is None:
+        return 0
+
+    count = 0
+    for coalition in mission.coalition.values():
+        for country in coalition.countries.values():
+            count += len(country.vehicle_group) + len(country.ship_group) + len(country.static_group)
+            count += len(country.plane_group) + len(country.helicopter_group)
+    return count
+
+
+class GenerationProfile:
+    def __init__(self, name: str, operation):
+        self.name = name
+        self.operation = operation
+        self.stages = []  # type: typing.List[typing.Dict]
+        self._stack = []  # type: typing.List[str]
+        self._start = time.perf_counter()
+        self._start_queries = operation.game.theater.landmap_queries
+
+    def _landmap_queries(self) -> int:
+        return self.operation.game.theater.landmap_queries
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        self._stack.append(name)
+        path = "/".join(self._stack)
+
+        start = time.perf_counter()
+        queries = self._landmap_queries()
+        groups = _groups_count(self.operation.current_mission)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self.stages.append({
+                "stage": path,
+                "time": time.perf_counter() - start,
+                "landmap_queries": self._landmap_queries() - queries,
+                "groups": _groups_count(self.operation.current_mission) - groups,
+            })
+
+    def save(self):
+        record = {
+            "mission": self.name,
+            "operation": type(self.operation).__name__,
+            "date": datetime.datetime.now().isoformat(),
+            "time": time.perf_counter() - self._start,
+            "landmap_queries": self._landmap_queries() - self._start_queries,
+            "groups": _groups_count(self.operation.current_mission),
+            "stages": self.stages,
+        }
+
+        try:
+            with open(profile_path(), "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logging.warning("Failed to write generation profile: {}".format(e))
+
+
+@contextlib.contextmanager
+def _no_stage():
+    yield
+
+
+def start(name: str, operation) -> typing.Optional[GenerationProfile]:
+    if not is_enabled():
+        return None
+
+    return GenerationProfile(name, operation)
+
+
+def stage(profile: typing.Optional[GenerationProfile], name: str):
+    if profile is None:
+        return _no_stage()
+
+    return profile.stage(name)
@@ -0,0 +1,205 @@
+import importlib
+import typing
+
+from dcs.mapping import Point
+
+from game import db
+from game.game import Game
+from game.event import UnitsDeliveryEvent
+from theater.theatergroundobject import TheaterGroundObject
+
+"""
+Explicit save schema. Only campaign state is stored: static theater data (terrain, landmap, control point
+positions and connections) is rehydrated from the theater definition the campaign was started with.
+"""
+
+SAVE_FORMAT = "liberation_save"
+SAVE_FORMAT_VERSION = 2
+# journals replayed over an older snapshot can mix records of both versions, so all of them are read
+SUPPORTED_SAVE_FORMAT_VERSIONS = [1, 2]
+
+
+class SaveFormatError(Exception):
+    pass
+
+
+def _qualified_name(cls) -> str:
+    return "{}.{}".format(cls.__module__, cls.__name__)
+
+
+def _class_from_qualified_name(name: str):
+    module_name, class_name = name.rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _serialize_units(units: typing.Dict) -> typing.Dict[str, int]:
+    return {db.unit_type_name(unit_type): count for unit_type, count in units.items()}
+
+
+def _deserialize_units(units: typing.Dict[str, int]) -> typing.Dict:
+    result = {}
+    for name, count in units.items():
+        unit_type = db.unit_type_from_name(name)
+        if unit_type is None:
+            raise SaveFormatError("Unknown unit type {}".format(name))
+
+        result[unit_type] = count
+
+    return result
+
+
+def _serialize_tasks(values: typing.Dict) -> typing.Dict[str, typing.Any]:
+    return {task.__name__: value for task, value in values.items()}
+
+
+def _deserialize_tasks(values: typing.Dict[str, typing.Any]) -> typing.Dict:
+    tasks = {task.__name__: task for task in db.UNIT_BY_TASK.keys()}
+    return {tasks[name]: value for name, value in values.items()}
+
+
+def _serialize_ground_object(ground_object) -> typing.List:
+    # ground objects make up most of the save, so they're stored as plain lists rather than dicts
+    position = ground_object.position
+    return [ground_object.cp_id, ground_object.group_id, ground_object.object_id, ground_object.dcs_identifier,
+            ground_object.is_dead, ground_object.heading, position.x, position.y]
+
+
+def _deserialize_ground_object(data) -> TheaterGroundObject:
+    if isinstance(data, dict):
+        # save format version 1
+        data = [data["cp_id"], data["group_id"], data["object_id"], data["dcs_identifier"],
+                data["is_dead"], data["heading"]] + data["position"]
+
+    ground_object = TheaterGroundObject()
+    ground_object.cp_id, ground_object.group_id, ground_object.object_id, ground_object.dcs_identifier = data[:4]
+    ground_object.is_dead, ground_object.heading = data[4:6]
+    ground_object.position = Point(*data[6:8])
+    return ground_object
+
+
+def _serialize_controlpoint(cp) -> typing.Dict:
+    return {
+        "name": cp.name,
+        "captured": cp.captured,
+        "base": {
+            "strength": cp.base.strength,
+            "aircraft": _serialize_units(cp.base.aircraft),
+            "armor": _serialize_units(cp.base.armor),
+            "aa": _serialize_units(cp.base.aa),
+            "commision_points": _serialize_tasks(cp.base.commision_points),
+        },
+        "ground_objects": [_serialize_ground_object(x) for x in cp.ground_objects],
+    }
+
+
+def _deserialize_controlpoint(cp, data: typing.Dict):
+    if cp.name != data["name"]:
+        raise SaveFormatError("Control point mismatch: expected {}, got {}".format(cp.name, data["name"]))
+
+    cp.captured = data["captured"]
+    cp.base.strength = data["base"]["strength"]
+    cp.base.aircraft = _deserialize_units(data["base"]["aircraft"])
+    cp.base.armor = _deserialize_units(data["base"]["armor"])
+    cp.base.aa = _deserialize_units(data["base"]["aa"])
+    cp.base.commision_points = _deserialize_tasks(data["base"]["commision_points"])
+    cp.ground_objects = [_deserialize_ground_object(x) for x in data["ground_objects"]]
+
+
+def _serialize_event(event, cp_indexes: typing.Dict) -> typing.Dict:
+    data = {
+        "type": _qualified_name(type(event)),
+        "attacker_name": event.attacker_name,
+        "defender_name": event.defender_name,
+        "from_cp": cp_indexes[event.from_cp],
+        "to_cp": cp_indexes[event.to_cp],
+    }
+
+    if isinstance(event, UnitsDeliveryEvent):
+        data["units"] = _serialize_units(event.units)
+
+    return data
+
+
+def _deserialize_event(data: typing.Dict, game):
+    event_class = _class_from_qualified_name(data["type"])
+    event = event_class(attacker_name=data["attacker_name"],
+                        defender_name=data["defender_name"],
+                        from_cp=game.theater.controlpoints[data["from_cp"]],
+                        to_cp=game.theater.controlpoints[data["to_cp"]],
+                        game=game)
+
+    if isinstance(event, UnitsDeliveryEvent):
+        event.units = _deserialize_units(data.get("units", {}))
+
+    return event
+
+
+def _serialize_settings(settings) -> typing.Dict:
+    return {key: getattr(settings, key) for key in _settings_fields(settings)}
+
+
+def _settings_fields(settings) -> typing.List[str]:
+    return [key for key, value in vars(type(settings)).items() if not key.startswith("_") and not callable(value)]
+
+
+def serialize_game(game) -> typing.Dict:
+    cp_indexes = {cp: i for i, cp in enumerate(game.theater.controlpoints)}
+
+    return {
+        "format": SAVE_FORMAT,
+        "version": SAVE_FORMAT_VERSION,
+        "theater": _qualified_name(type(game.theater)),
+        "player": game.player,
+        "enemy": game.enemy,
+        "budget": game.budget,
+        "settings": _serialize_settings(game.settings),
+        "controlpoints": [_serialize_controlpoint(cp) for cp in game.theater.controlpoints],
+        "events": [_serialize_event(event, cp_indexes) for event in game.events],
+        "ignored_cps": [cp_indexes[cp] for cp in game.ignored_cps] if game.ignored_cps is not None else None,
+    }
+
+
+def deserialize_game(data: typing.Dict):
+    if data.get("format") != SAVE_FORMAT:
+        raise SaveFormatError("Not a liberation save")
+
+    if data.get("version") not in SUPPORTED_SAVE_FORMAT_VERSIONS:
+        raise SaveFormatError("Unsupported save version {}".format(data.get("version")))
+
+    theater = _class_from_qualified_name(data["theater"])()
+    if len(theater.controlpoints) != len(data["controlpoints"]):
+        raise SaveFormatError("Theater {} does not match the save".format(data["theater"]))
+
+    for cp, cp_data in zip(theater.controlpoints, data["controlpoints"]):
+        _deserialize_controlpoint(cp, cp_data)
+
+    game = Game(player_name=data["player"], enemy_name=data["enemy"], theater=theater)
+    game.budget = data["budget"]
+    for key, value in data["settings"].items():
+        setattr(game.settings, key, value)
+
+    game.events = [_deserialize_event(x, game) for x in data["events"]]
+    if data["ignored_cps"] is not None:
+        game.ignored_cps = [theater.controlpoints[i] for i in data["ignored_cps"]]
+
+    return game
+
+
+def diff_game_state(old: typing.Dict, new: typing.Dict) -> typing.Optional[typing.Dict]:
+    """
+    Returns changes between two serialized states of the same campaign as a journal record body,
+    or None if states could not be diffed (different theater or control points).
+    """
+    if old.get("theater") != new.get("theater") or len(old["controlpoints"]) != len(new["controlpoints"]):
+        return None
+
+    return {
+        "game": {k: v for k, v in new.items() if k != "controlpoints" and old.get(k) != v},
+        "controlpoints": {str(i): cp for i, (old_cp, cp) in enumerate(zip(old["controlpoints"], new["controlpoints"])) if old_cp != cp},
+    }
+
+
+def apply_game_state_diff(state: typing.Dict, diff: typing.Dict):
+    state.update(diff.get("game", {}))
+    for index, cp in diff.get("controlpoints", {}).items():
+        state["controlpoints"][int(index)] = cp